@@ -1,10 +1,18 @@
 # app/api/v1/resumes.py
-from fastapi import APIRouter, Depends, HTTPException, Response, BackgroundTasks
+import asyncio
+import json
+import re
+import zipfile
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.auth import get_current_active_user
-from app.schemas.resume import LatexCompileRequest
-from app.utils.latex import LatexCompiler
+from app.core.database import get_db, SessionLocal
+from app.core.auth import get_current_active_user, get_user_from_token
+from app.core.settings import settings
+from app.schemas.resume import LatexCompileRequest, BatchCompileRequest
+from app.services.live_preview import PreviewChannel, parse_preview_message, preview_stats
+from app.utils.latex import LatexCompiler, render_latex_template
+from app.utils.responses import open_file_response
 from app.models.user import User
 
 router = APIRouter()
@@ -17,12 +25,12 @@ async def compile_latex(
     current_user: User = Depends(get_current_active_user)
 ):
     try:
-        pdf_content = await LatexCompiler.compile_latex(
-            content=request.content
-        )
-        
-        return Response(
-            content=pdf_content,
+        pdf_file = await LatexCompiler.open_compiled_pdf(content=request.content)
+
+        # Served from the cached file rather than copied through memory; the
+        # open descriptor keeps it readable if the cache evicts it meanwhile
+        return open_file_response(
+            pdf_file,
             media_type="application/pdf",
             headers={
                 "Content-Disposition": "inline; filename=preview.pdf",
@@ -38,4 +46,140 @@ async def compile_latex(
         raise HTTPException(
             status_code=500,
             detail=f"Error during compilation: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+class _ZipChunks:
+    """Write-only sink for zipfile; the archive is streamed as it is built."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+async def _stream_batch_zip(names, contents):
+    sink = _ZipChunks()
+    manifest = []
+    # PDFs are already compressed, so store them as-is
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for index, pdf, error in LatexCompiler.compile_many(contents):
+            entry = {"index": index, "name": names[index]}
+            if pdf is not None:
+                entry["file"] = f"{index:03d}-{names[index]}.pdf"
+                archive.writestr(entry["file"], pdf)
+            else:
+                entry["error"] = error
+            manifest.append(entry)
+            yield sink.drain()
+        manifest.sort(key=lambda entry: entry["index"])
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    yield sink.drain()
+
+@router.post("/compile/batch")
+async def compile_latex_batch(
+    request: BatchCompileRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Compile many résumé variants in one request. Each item is either a full
+    LaTeX source or a set of parameters for the shared template. The response
+    is a ZIP streamed as compiles finish, with a manifest.json of per-item
+    results (including compile errors) at the end.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items to compile")
+    if len(request.items) > settings.BATCH_COMPILE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {settings.BATCH_COMPILE_MAX_ITEMS} items"
+        )
+
+    names, contents = [], []
+    for index, item in enumerate(request.items):
+        if item.content is not None:
+            contents.append(item.content)
+        elif item.parameters is not None and request.template is not None:
+            contents.append(render_latex_template(request.template, item.parameters))
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Item {index} needs either 'content' or 'parameters' with a 'template'"
+            )
+        names.append(re.sub(r"[^\w.-]+", "_", item.name or "resume")[:64])
+
+    return StreamingResponse(
+        _stream_batch_zip(names, contents),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=resumes.zip"}
+    )
+
+@router.get("/compile/stats")
+async def compile_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Compile pool utilisation, queue-wait and compile-time figures"""
+    return {**LatexCompiler.stats(), "preview": dict(preview_stats)}
+
+@router.websocket("/preview/ws")
+async def live_preview(
+    websocket: WebSocket,
+    token: str = Query(...)
+):
+    """
+    Live preview channel. The client sends {"revision": n, "content": "..."}
+    on every edit; the server replies for the newest revision only, with a
+    {"type": "pdf", "revision": n} frame followed by the PDF as a binary
+    frame, or {"type": "error", "revision": n, "detail": "..."}.
+    """
+    db = SessionLocal()
+    try:
+        user = await get_user_from_token(db, token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    finally:
+        db.close()
+    if not user.is_active:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+
+    async def send_pdf(revision: int, pdf_content: bytes):
+        await websocket.send_json({"type": "pdf", "revision": revision, "size": len(pdf_content)})
+        await websocket.send_bytes(pdf_content)
+
+    async def send_error(revision: int, detail: str):
+        await websocket.send_json({"type": "error", "revision": revision, "detail": detail})
+
+    channel = PreviewChannel(
+        compile=LatexCompiler.compile_latex,
+        send_pdf=send_pdf,
+        send_error=send_error,
+        debounce=settings.PREVIEW_DEBOUNCE_MS / 1000
+    )
+    worker = asyncio.ensure_future(channel.run())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            try:
+                revision, content = parse_preview_message(message.get("text"), channel.latest_revision)
+            except ValueError as e:
+                await send_error(channel.latest_revision, str(e))
+                continue
+            channel.submit(revision, content)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
+        await channel.close()
\ No newline at end of file
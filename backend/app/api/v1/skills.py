@@ -1,42 +1,284 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Body, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import base64
+import json
+from datetime import datetime
+from functools import lru_cache
 import shutil
 import tempfile
+import time
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
-from groq import Groq
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from uuid import UUID
 from app.models.skills import Skill as SkillModel
 from app.models.skills import UserSkill, SkillCategory
 from app.schemas.skills import (
-    SkillCreate,
     Skill as SkillSchema,
     UserSkillCreate,
     UserSkill as UserSkillSchema,
     BatchSkillsByCategory,
-    SingleSkillCreate
+    SingleSkillCreate,
+    SkillCategorizeRequest,
+    SkillCategorization,
+    RelatedSkill
 )
 from app.core.auth import get_current_active_user
-from app.core.GPTskillextraction_utils import extract_resume_content, llama_extract_skills_groq
+from app.core.GPTskillextraction_utils import (
+    GROQ_PROMPT_VERSION,
+    extract_resume_content,
+    llama_extract_skills_groq
+)
 # from app.core.skill_categorization import infer_skill_category
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal, dialect_insert
 from app.models.user import User
-import os
+from app.services.extraction_cache import ExtractionCache
+from app.services.llm_client import CircuitBreaker, LLMClient, LLMError, LLMUnavailable
+from app.services.skill_embeddings import SkillEmbeddingIndex, embed_with_spacy
+from app.services.skill_index import SkillIndex
+from app.services.skill_matcher import SkillMatcher, grouping_key, skill_key
+from app.services.skill_search import MIN_QUERY_LENGTH, skill_fts
 from app.core.config import settings
 
 router = APIRouter()
 
-# Initialize Groq client at module level
-groq_client = Groq(api_key=settings.GROQ_API_KEY)
 MODEL_NAME = "llama3-8b-8192"
 
+
+@lru_cache()
+def get_groq_client() -> LLMClient:
+    """Async Groq client with pooled connections, shared by every request in this worker."""
+    return LLMClient(
+        settings.GROQ_BASE_URL,
+        settings.GROQ_API_KEY,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        connect_timeout=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        max_retries=settings.LLM_MAX_RETRIES,
+        breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS),
+    )
+
+# Serves autocomplete from memory; writers below add what they commit
+skill_index = SkillIndex(refresh_seconds=settings.SKILL_INDEX_REFRESH_SECONDS)
+# Maps misspelled or differently punctuated names onto existing skills
+skill_matcher = SkillMatcher(max_distance=settings.SKILL_MATCH_MAX_DISTANCE)
+
+# "Related skills" neighbours; the vectors are an mmap'd file shared by every worker
+skill_embeddings = SkillEmbeddingIndex(
+    settings.SKILL_EMBEDDINGS_DIR,
+    ivf_min_skills=settings.SKILL_EMBEDDINGS_IVF_MIN_SKILLS,
+    nprobe=settings.SKILL_EMBEDDINGS_NPROBE,
+    refresh_seconds=settings.SKILL_INDEX_REFRESH_SECONDS,
+)
+
+# Re-uploads of a resume reuse the earlier LLM extraction instead of calling Groq
+extraction_cache = ExtractionCache(
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+)
+
+
+def ensure_skill_index(db: Session) -> SkillIndex:
+    """Load the index and matcher on first use, and reload them when other workers have added skills."""
+    if skill_index.stale():
+        count = db.query(func.count(SkillModel.id)).scalar()
+        if not skill_index.loaded or count != len(skill_index):
+            rows = db.query(SkillModel).all()
+            skill_index.load(rows)
+            skill_matcher.load(rows)
+        skill_index.mark_checked()
+    return skill_index
+
+
+def ensure_skill_embeddings(db: Session) -> SkillEmbeddingIndex:
+    """Map the current embeddings build, and at most once a refresh period bring it up to date with the catalog."""
+    skill_embeddings.load()
+    if skill_embeddings.loaded and not skill_embeddings.stale():
+        return skill_embeddings
+    count = db.query(func.count(SkillModel.id)).scalar()
+    if count and count != len(skill_embeddings):
+        rows = db.query(SkillModel.id, SkillModel.name).order_by(SkillModel.id).all()
+        # With a build to serve, don't queue behind a worker that is already building
+        skill_embeddings.build(
+            [(row.id, row.name) for row in rows], embed_with_spacy, wait=not skill_embeddings.loaded
+        )
+    skill_embeddings.mark_checked()
+    return skill_embeddings
+
+
+def remember_skills(skills) -> None:
+    """Make newly committed skills searchable and matchable in this worker."""
+    for skill in skills:
+        skill_index.add(skill)
+        skill_matcher.add(skill.name, skill.id)
+
+
+def resolve_skills(db: Session, names: List[str]) -> Dict[str, Any]:
+    """Map each name to the id of the skill it refers to (None if new), with one query at most."""
+    ensure_skill_index(db)
+    resolved = {name: skill_matcher.match(name) for name in names}
+    unknown = {}
+    unkeyed = []
+    for name, skill_id in resolved.items():
+        if skill_id is None:
+            key = skill_key(name)
+            if key:
+                unknown[key] = name
+            else:
+                # Only matches a skill of exactly this name
+                unkeyed.append(name)
+    if unknown or unkeyed:
+        # Added by other workers since the matcher was loaded
+        for skill_id, normalized_name, name in db.execute(
+            select(SkillModel.id, SkillModel.normalized_name, SkillModel.name).where(or_(
+                SkillModel.normalized_name.in_(unknown), SkillModel.name.in_(unkeyed)
+            ))
+        ):
+            resolved[unknown.get(normalized_name, name)] = skill_id
+    return resolved
+
+
+def insert_skills_ignoring_conflicts(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Bulk INSERT ... ON CONFLICT DO NOTHING, so concurrent writers of the same
+    skill (or of two spellings with the same normalized name) both succeed.
+    """
+    insert = dialect_insert(db)
+    db.execute(insert(SkillModel).on_conflict_do_nothing(), rows)
+
+
+def upsert_user_skills(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Bulk insert user skills, updating the rating where the user already has the skill."""
+    insert = dialect_insert(db)
+    statement = insert(UserSkill)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserSkill.user_id, UserSkill.skill_id],
+            set_={"rating": statement.excluded.rating, "updated_at": datetime.utcnow()}
+        ),
+        rows
+    )
+
+
+def fetch_skills_by_name(db: Session, names: List[str], resolved: Dict[str, Any]) -> Dict[str, SkillModel]:
+    """Re-select the skills behind ``names`` in one query, keyed by name."""
+    ids = [skill_id for skill_id in resolved.values() if skill_id is not None]
+    new_names = [name for name in names if resolved.get(name) is None]
+    rows = db.scalars(select(SkillModel).where(or_(
+        SkillModel.id.in_(ids),
+        SkillModel.normalized_name.in_([skill_key(name) for name in new_names if skill_key(name)]),
+        SkillModel.name.in_([name for name in new_names if not skill_key(name)])
+    ))).all()
+    by_id = {row.id: row for row in rows}
+    by_key = {row.normalized_name or row.name: row for row in rows}
+
+    skills = {}
+    for name in names:
+        skill_id = resolved.get(name)
+        skill = by_id.get(skill_id) if skill_id is not None else by_key.get(grouping_key(name))
+        if skill is not None:
+            skills[name] = skill
+    return skills
+
+
+def find_skill(db: Session, name: str) -> Optional[SkillModel]:
+    """Existing skill that ``name`` refers to, tolerating typos and punctuation."""
+    ensure_skill_index(db)
+    skill_id = skill_matcher.match(name)
+    if skill_id is not None:
+        skill = db.get(SkillModel, skill_id)
+        if skill:
+            return skill
+    # Added by another worker since the matcher was loaded
+    key = skill_key(name)
+    if not key:
+        return db.query(SkillModel).filter(SkillModel.name == name).first()
+    return db.query(SkillModel).filter(SkillModel.normalized_name == key).first()
+
+
+# Rows fetched per round trip when streaming the catalog
+SKILL_STREAM_BATCH_SIZE = 500
+
+
+def encode_skill_cursor(skill) -> str:
+    return base64.urlsafe_b64encode(json.dumps([skill.name, str(skill.id)]).encode()).decode()
+
+
+def decode_skill_cursor(cursor: str):
+    try:
+        name, skill_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return name, str(skill_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def skills_after(cursor: Optional[str]):
+    """Catalog in (name, id) order, starting after ``cursor`` if given."""
+    statement = select(SkillModel).order_by(SkillModel.name, SkillModel.id)
+    if cursor:
+        name, skill_id = decode_skill_cursor(cursor)
+        statement = statement.where(or_(
+            SkillModel.name > name,
+            and_(SkillModel.name == name, SkillModel.id > skill_id)
+        ))
+    return statement
+
+
+def stream_skills_ndjson(cursor: Optional[str]):
+    # Own session: the request's one is closed before the body is sent
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            skills_after(cursor).execution_options(yield_per=SKILL_STREAM_BATCH_SIZE)
+        ).scalars()
+        for skill in rows:
+            yield SkillSchema.model_validate(skill).model_dump_json() + "\n"
+    finally:
+        db.close()
+
+
 @router.get("/skills", response_model=List[SkillSchema])
 async def search_skills(
+    response: Response,
     query: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
     db: Session = Depends(get_db)
 ):
-    """Search for skills."""
+    """
+    Search for skills by name prefix or substring, best matches first.
+    Names are matched in memory; a query that no name contains falls back
+    to the database's full-text search, which also covers descriptions.
+
+    Without a query, pages through the whole catalog by name: pass the
+    X-Next-Cursor header of one page as ``cursor`` to get the next, or use
+    format=ndjson to stream every skill from ``cursor`` on, one per line.
+    """
     if query:
-        return db.query(SkillModel).filter(SkillModel.name.ilike(f"%{query}%")).all()
-    return db.query(SkillModel).all()
+        index = ensure_skill_index(db)
+        skills = index.search(query, limit=limit, offset=offset)
+        if (
+            not skills
+            and skill_fts.available
+            and len(query.strip()) >= MIN_QUERY_LENGTH
+            and not index.search(query, limit=1)
+        ):
+            # No skill name contains the query; the database also matches descriptions
+            return skill_fts.search(db, query, limit=limit, offset=offset)
+        return skills
+
+    if format == "ndjson":
+        if cursor:
+            decode_skill_cursor(cursor)  # reject a bad cursor before the stream starts
+        return StreamingResponse(stream_skills_ndjson(cursor), media_type="application/x-ndjson")
+
+    skills = db.scalars(skills_after(cursor).limit(limit)).all()
+    if len(skills) == limit:
+        response.headers["X-Next-Cursor"] = encode_skill_cursor(skills[-1])
+    return skills
 
 @router.post("/skills/extract", response_model=List[SkillSchema])
 async def extract_skills(
@@ -69,53 +311,122 @@ async def extract_skills(
         if not resume_text.strip():
             raise HTTPException(status_code=400, detail="No content found in the resume.")
 
-        # 4. Extract skills using Groq + Llama
-        categorized_skills = llama_extract_skills_groq(resume_text, groq_client, MODEL_NAME)
+        # 4. Extract skills using Groq + Llama, unless this text was extracted before
+        cache_key = ExtractionCache.fingerprint(resume_text, MODEL_NAME, GROQ_PROMPT_VERSION)
+        categorized_skills = extraction_cache.get(db, cache_key)
+        if categorized_skills is None:
+            started = time.perf_counter()
+            categorized_skills = await llama_extract_skills_groq(resume_text, get_groq_client(), MODEL_NAME)
+            if categorized_skills:
+                extraction_cache.put(
+                    db, cache_key, MODEL_NAME, GROQ_PROMPT_VERSION,
+                    categorized_skills, time.perf_counter() - started
+                )
         if not categorized_skills:
             raise HTTPException(
                 status_code=400,
                 detail="No skills could be extracted from the provided resume."
             )
 
-        # 5. Save the recognized skills to DB if they are new
-        saved_skills = []
+        # 5. Save the recognized skills to DB if they are new: resolve every
+        # name at once, insert the missing ones in one statement, commit once
+        wanted = {}
         for skill_name, category in categorized_skills:
             # Skip empty or invalid skills
-            if not skill_name or len(skill_name) < 2:
+            skill_name = (skill_name or "").strip()
+            if len(skill_name) < 2:
                 continue
+            wanted.setdefault(grouping_key(skill_name), (skill_name, category))
 
-            # Check for existing skill
-            skill = db.query(SkillModel).filter(
-                SkillModel.name.ilike(skill_name)
-            ).first()
-
-            if not skill:
-                skill = SkillModel(
-                    name=skill_name.strip(),
-                    category=category,
-                    source="GPT"
-                )
-                db.add(skill)
-                try:
-                    db.commit()
-                    db.refresh(skill)
-                except Exception:
-                    db.rollback()
-                    # Skip if error
-                    continue
-
-            saved_skills.append(skill)
+        resolved = resolve_skills(db, [name for name, _ in wanted.values()])
+        missing = [
+            {"name": name, "category": category, "source": "GPT"}
+            for name, category in wanted.values()
+            if resolved.get(name) is None
+        ]
+        if missing:
+            insert_skills_ignoring_conflicts(db, missing)
+        db.commit()
 
+        # Rows other uploads inserted concurrently are picked up here too
+        skills_by_name = fetch_skills_by_name(db, [name for name, _ in wanted.values()], resolved)
+        # Two spellings may have resolved to the same skill
+        saved_skills = list(dict.fromkeys(skills_by_name.values()))
+        remember_skills(saved_skills)
         return saved_skills
 
     except HTTPException:
         raise
+    except LLMUnavailable as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Skill extraction is temporarily unavailable: {str(e)}",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=f"Skill extraction failed: {str(e)}")
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing skills: {str(e)}"
         )
 
+@router.get("/skills/extract/stats")
+async def extraction_cache_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Hit rate and LLM time saved by the extraction cache, and how the LLM calls fared"""
+    return {**extraction_cache.stats(db), "llm": get_groq_client().stats()}
+
+@router.post("/skills/categorize", response_model=List[SkillCategorization])
+async def categorize_skills(
+    request: SkillCategorizeRequest,
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Infer categories for many skill names in one vectorized pass.
+    """
+    # Fits the vectorizer on first use, so only pay for it when asked
+    from app.core.skill_categorization import get_categorizer
+
+    names = request.names
+    results = await run_in_threadpool(get_categorizer().categorize_many, names)
+    return [
+        {"name": name, "category": category.value, "confidence": round(confidence, 4)}
+        for name, (category, confidence) in zip(names, results)
+    ]
+
+@router.get("/skills/{skill_id}/related", response_model=List[RelatedSkill])
+async def related_skills(
+    skill_id: UUID,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Skills most similar in meaning to the given one, best first.
+    """
+    if db.get(SkillModel, skill_id) is None:
+        raise HTTPException(status_code=404, detail="Skill not found")
+
+    try:
+        # The first call embeds every skill with spaCy; later ones only skills added since
+        index = await run_in_threadpool(ensure_skill_embeddings, db)
+    except (ImportError, OSError) as e:
+        raise HTTPException(status_code=503, detail=f"Related skills are unavailable: {str(e)}")
+
+    neighbours = index.related(skill_id, limit)
+    skills = {
+        str(skill.id): skill
+        for skill in db.query(SkillModel).filter(SkillModel.id.in_([UUID(other) for other, _ in neighbours]))
+    }
+    return [
+        {"skill": skills[other], "score": round(score, 4)}
+        for other, score in neighbours
+        if other in skills
+    ]
+
 @router.post("/user-skills", response_model=UserSkillSchema)
 async def add_user_skill(
     user_skill: UserSkillCreate,
@@ -127,15 +438,15 @@ async def add_user_skill(
     if not db_skill:
         raise HTTPException(status_code=404, detail="Skill not found")
     
-    db_user_skill = UserSkill(
-        user_id=current_user.id,
-        skill_id=user_skill.skill_id,
-        rating=user_skill.rating
-    )
-    db.add(db_user_skill)
+    # Adding a skill the user already has updates its rating
+    upsert_user_skills(db, [
+        {"user_id": current_user.id, "skill_id": db_skill.id, "rating": user_skill.rating}
+    ])
     db.commit()
-    db.refresh(db_user_skill)
-    return db_user_skill
+    return db.scalars(select(UserSkill).where(
+        UserSkill.user_id == current_user.id,
+        UserSkill.skill_id == db_skill.id
+    ).execution_options(populate_existing=True)).unique().one()
 
 @router.post("/user-skills/batch", response_model=List[UserSkillSchema])
 async def add_user_skills_batch(
@@ -143,58 +454,62 @@ async def add_user_skills_batch(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Add multiple skills for the current user, organized by category."""
-    try:
-        saved_skills = []
+    """
+    Add multiple skills for the current user, organized by category.
 
-        # Process each category
+    Set-based: one lookup for all names, one bulk insert of new skills, one
+    upsert of the user's ratings and one re-select, however many skills are sent.
+    """
+    try:
         categories_map = {
             'hard_skills': SkillCategory.HARD,
             'soft_skills': SkillCategory.SOFT,
             'technical_skills': SkillCategory.TECHNICAL
         }
 
+        # Same skill sent twice: first spelling, last rating
+        wanted = {}
         for category_key, category_enum in categories_map.items():
-            skills_list = getattr(skills, category_key)
-            for skill_data in skills_list:
-                # Check if skill exists
-                db_skill = db.query(SkillModel).filter(
-                    SkillModel.name.ilike(skill_data.name)
-                ).first()
-
-                # Create skill if it doesn't exist
-                if not db_skill:
-                    db_skill = SkillModel(
-                        name=skill_data.name,
-                        category=category_enum,
-                        source="USER"
-                    )
-                    db.add(db_skill)
-                    db.flush()  # Get ID without committing
-
-                # Create or update user skill
-                db_user_skill = db.query(UserSkill).filter(
-                    UserSkill.user_id == current_user.id,
-                    UserSkill.skill_id == db_skill.id
-                ).first()
-
-                if db_user_skill:
-                    db_user_skill.rating = skill_data.rating
-                else:
-                    db_user_skill = UserSkill(
-                        user_id=current_user.id,
-                        skill_id=db_skill.id,
-                        rating=skill_data.rating
-                    )
-                    db.add(db_user_skill)
-
-                saved_skills.append(db_user_skill)
+            for skill_data in getattr(skills, category_key):
+                name = skill_data.name.strip()
+                if not name:
+                    continue
+                key = grouping_key(name)
+                first_name, first_category, _ = wanted.get(key, (name, category_enum, None))
+                wanted[key] = (first_name, first_category, skill_data.rating)
+        names = [name for name, _, _ in wanted.values()]
 
+        resolved = resolve_skills(db, names)
+        missing = [
+            {"name": name, "category": category, "source": "USER"}
+            for name, category, _ in wanted.values()
+            if resolved.get(name) is None
+        ]
+        if missing:
+            insert_skills_ignoring_conflicts(db, missing)
+        skills_by_name = fetch_skills_by_name(db, names, resolved)
+
+        # Keyed by skill so two spellings of one skill become one row
+        ratings = {}
+        for name, _, rating in wanted.values():
+            if name in skills_by_name:
+                ratings[skills_by_name[name].id] = rating
+        if ratings:
+            upsert_user_skills(db, [
+                {"user_id": current_user.id, "skill_id": skill_id, "rating": rating}
+                for skill_id, rating in ratings.items()
+            ])
         db.commit()
-        for skill in saved_skills:
-            db.refresh(skill)
 
-        return saved_skills
+        # Skill is eager-loaded by the relationship's joined strategy
+        saved = db.scalars(select(UserSkill).where(
+            UserSkill.user_id == current_user.id,
+            UserSkill.skill_id.in_(list(ratings))
+        ).execution_options(populate_existing=True)).unique().all()
+        by_skill = {user_skill.skill_id: user_skill for user_skill in saved}
+        remember_skills(skills_by_name.values())
+
+        return [by_skill[skill_id] for skill_id in ratings if skill_id in by_skill]
 
     except Exception as e:
         db.rollback()
@@ -211,10 +526,8 @@ async def add_single_user_skill(
 ):
     """Add a single skill with category for the current user."""
     try:
-        # Check if skill exists
-        db_skill = db.query(SkillModel).filter(
-            SkillModel.name.ilike(skill_data.name)
-        ).first()
+        # Check if skill exists, including near-duplicate spellings
+        db_skill = find_skill(db, skill_data.name)
 
         # Create skill if it doesn't exist
         if not db_skill:
@@ -244,6 +557,7 @@ async def add_single_user_skill(
 
         db.commit()
         db.refresh(db_user_skill)
+        remember_skills([db_user_skill.skill])
         return db_user_skill
 
     except Exception as e:
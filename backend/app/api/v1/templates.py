@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.responses import FileResponse, RedirectResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import List
+from typing import BinaryIO, List
 import os
+import re
+import shutil
 import uuid
 import tempfile
 from app.core.database import get_db
@@ -15,7 +17,11 @@ from app.schemas.template import (
     Template as TemplateSchema,
     PredefinedTemplate as PredefinedTemplateSchema
 )
-from app.utils.pdf import convert_latex_to_pdf
+from app.utils.pdf import thumbnail_cache
+from app.utils.latex import LatexCompiler
+from app.utils.responses import open_file_response
+from app.services.thumbnails import THUMBNAIL_WIDTHS, MEDIA_TYPES, RasterizationError
+from app.core.config import API_V1_STR
 from app.core.cloudinary_utils import upload_file_to_cloudinary, delete_resource_from_cloudinary
 
 
@@ -43,6 +49,63 @@ async def get_predefined_template(
         raise HTTPException(status_code=404, detail="Template not found")
     return template
 
+async def _thumbnail_redirect(pdf_file: BinaryIO, width: int, image_format: str) -> RedirectResponse:
+    """Render page 1 of an open PDF and redirect to its content-addressed URL"""
+    with pdf_file:
+        if width not in THUMBNAIL_WIDTHS:
+            raise HTTPException(status_code=400, detail=f"Width must be one of {list(THUMBNAIL_WIDTHS)}")
+        try:
+            pdf_hash = await thumbnail_cache.render(pdf_file, width, image_format)
+        except RasterizationError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to render thumbnail: {str(e)}")
+    image_format = thumbnail_cache.normalize_format(image_format)
+    return RedirectResponse(
+        url=f"{API_V1_STR}/templates/thumbnails/{pdf_hash}?width={width}&format={image_format}",
+        status_code=307
+    )
+
+@router.get("/thumbnails/{pdf_hash}")
+async def get_thumbnail(
+    pdf_hash: str,
+    width: int = Query(320),
+    format: str = Query("png")
+):
+    """Serve a rendered page-1 thumbnail by the PDF's content hash, rendering this size if needed"""
+    if not re.fullmatch(r"[0-9a-f]{64}", pdf_hash):
+        raise HTTPException(status_code=400, detail="Invalid thumbnail id")
+    if width not in THUMBNAIL_WIDTHS:
+        raise HTTPException(status_code=400, detail=f"Width must be one of {list(THUMBNAIL_WIDTHS)}")
+    image_format = thumbnail_cache.normalize_format(format)
+    thumbnail = thumbnail_cache.open(pdf_hash, width, image_format)
+    if thumbnail is None:
+        try:
+            thumbnail = await thumbnail_cache.render_hash(pdf_hash, width, image_format)
+        except RasterizationError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to render thumbnail: {str(e)}")
+    if thumbnail is None:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    return open_file_response(
+        thumbnail,
+        media_type=MEDIA_TYPES[image_format],
+        # Content-addressed, so it can never change; private because it may
+        # render a user's own resume
+        headers={"Cache-Control": "private, max-age=31536000, immutable"}
+    )
+
+@router.get("/predefined/{template_id}/thumbnail")
+async def get_predefined_template_thumbnail(
+    template_id: uuid.UUID,
+    width: int = Query(320),
+    format: str = Query("png"),
+    db: Session = Depends(get_db)
+):
+    """Thumbnail of a predefined template's first page"""
+    template = db.query(PredefinedTemplate).filter(PredefinedTemplate.id == template_id).first()
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    pdf_file = await LatexCompiler.open_compiled_pdf(template.content)
+    return await _thumbnail_redirect(pdf_file, width, format)
+
 # New endpoint: Select predefined template
 @router.post("/select/{template_id}", response_model=TemplateSchema)
 async def select_predefined_template(
@@ -119,6 +182,26 @@ async def get_user_template(
     return template
 
 
+@router.get("/my-template/thumbnail")
+async def get_user_template_thumbnail(
+    width: int = Query(320),
+    format: str = Query("png"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Thumbnail of the user's template, so list views need not download the PDF"""
+    template = db.query(Template).filter(Template.user_id == current_user.id).first()
+    if not template:
+        raise HTTPException(status_code=404, detail="No template found for this user.")
+    try:
+        pdf_file = open(template.pdf_path, "rb") if template.pdf_path else None
+    except OSError:
+        pdf_file = None
+    if pdf_file is None:
+        pdf_file = await LatexCompiler.open_compiled_pdf(template.content)
+    return await _thumbnail_redirect(pdf_file, width, format)
+
+
 # 3️⃣ Upload Template (Convert LaTeX to PDF)
 @router.post("/upload", response_model=TemplateSchema)
 async def upload_template(
@@ -161,11 +244,18 @@ async def upload_template(
     with open(tex_path, "w") as f:
         f.write(template_content)
 
-    # Step 5: Convert LaTeX to PDF
+    # Step 5: Convert LaTeX to PDF on the shared engine, then copy it out of
+    # the cache since finalize deletes the preview file
     try:
-        pdf_path = convert_latex_to_pdf(latex_filepath=tex_path, output_directory=temp_dir)
+        pdf_path = os.path.join(temp_dir, pdf_filename)
+        with await LatexCompiler.open_compiled_pdf(template_content) as cached_pdf, open(pdf_path, "wb") as f:
+            shutil.copyfileobj(cached_pdf, f)
         db_template.pdf_path = pdf_path  # Store pdf_path in the DB
         db_template.unique_id = unique_id  # Optional: store unique_id in DB
+    except HTTPException as e:
+        if e.status_code in (503, 504):
+            raise
+        raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {e.detail}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
 
@@ -1,12 +1,13 @@
-from PyPDF2 import PdfReader
-from groq import Groq
-import openai
 import re
-import os
 from typing import List, Tuple
 import json
 from enum import Enum
 from app.models.skills import SkillCategory
+from app.services.llm_client import LLMClient, LLMError
+
+# Part of the extraction cache key: bump it whenever the Groq prompt or the
+# parsing of its answer changes, so extractions made the old way are not reused
+GROQ_PROMPT_VERSION = "1"
 
 
 def extract_resume_content(file_path: str, file_type: str = "pdf") -> str:
@@ -16,6 +17,9 @@ def extract_resume_content(file_path: str, file_type: str = "pdf") -> str:
     # Read file content
     content = ""
     if file_type.lower() == "pdf":
+        # Imported here: it is slow to import and most requests never read a PDF
+        from PyPDF2 import PdfReader
+
         reader = PdfReader(file_path)
         content = " ".join(page.extract_text() for page in reader.pages if page.extract_text())
     elif file_type.lower() == "tex":
@@ -46,14 +50,12 @@ def extract_resume_content(file_path: str, file_type: str = "pdf") -> str:
     # Return extracted content or notify of an empty extraction
     return extracted_content.strip() if extracted_content else "No relevant content found."
 
-def gpt_extract_skills(resume_content: str) -> dict:
+async def gpt_extract_skills(resume_content: str, client: LLMClient, model: str = "gpt-3.5-turbo") -> dict:
     """
     Uses GPT to extract and categorize skills from resume content, ensuring JSON validation.
+    ``client`` should point at the OpenAI API (https://api.openai.com/v1).
+    Output that is not the requested JSON raises LLMError.
     """
-    openai.api_key = os.getenv("OPENAI_API_KEY")
-    if not openai.api_key:
-        raise ValueError("OpenAI API Key is not set in the environment.")
-
     prompt = f"""
     You are an expert at analyzing resumes. Given the text below, identify and categorize the skills into the following categories:
 
@@ -71,29 +73,27 @@ def gpt_extract_skills(resume_content: str) -> dict:
       "hard_skills": ["Skill1", "Skill2", ...]
     }}
     """
+    raw_output = await client.chat(
+        messages=[{"role": "user", "content": prompt}],
+        model=model,
+    )
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-        )
-        raw_output = response.choices[0].message.content
-
         # Extract JSON from the output
         json_text = re.search(r"{[\s\S]*}", raw_output).group(0)
         parsed_output = json.loads(json_text)
         return parsed_output
     except (AttributeError, json.JSONDecodeError):
-        raise ValueError("GPT output did not return valid JSON.")
-    except Exception as e:
-        raise ValueError(f"An error occurred with GPT: {str(e)}")
+        raise LLMError("GPT output did not return valid JSON.")
     
 
 
-def llama_extract_skills_groq(resume_content: str, client: Groq, model: str) -> list:
+async def llama_extract_skills_groq(resume_content: str, client: LLMClient, model: str) -> list:
     """
     Uses Groq API with Llama to extract and categorize skills from resume content.
-    Returns a flattened list of skills with their categories.
+    Returns a flattened list of skills with their categories. Provider failures
+    and output that is not the requested JSON raise LLMError / LLMUnavailable.
     """
+
     prompt = f"""
     You are an expert at analyzing resumes. Given the text below, identify and categorize the skills into the following categories:
 
@@ -112,19 +112,17 @@ def llama_extract_skills_groq(resume_content: str, client: Groq, model: str) ->
     }}
     """
 
+    response_text = await client.chat(
+        messages=[
+            {"role": "system", "content": "You are a professional skill extractor that provides output strictly in the requested JSON format."},
+            {"role": "user", "content": prompt}
+        ],
+        model=model,
+        temperature=0.1,  # Low temperature for consistent, structured output
+        max_tokens=500
+    )
+
     try:
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a professional skill extractor that provides output strictly in the requested JSON format."},
-                {"role": "user", "content": prompt}
-            ],
-            model=model,
-            temperature=0.1,  # Low temperature for consistent, structured output
-            max_tokens=500
-        )
-
-        # Get the response and parse JSON
-        response_text = response.choices[0].message.content
         # Extract JSON from the response (in case there's any extra text)
         json_str = response_text[response_text.find('{'):response_text.rfind('}')+1]
         skills_data = json.loads(json_str)
@@ -140,7 +138,6 @@ def llama_extract_skills_groq(resume_content: str, client: Groq, model: str) ->
 
         return categorized_skills
 
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Error parsing JSON response: {str(e)}")
-    except Exception as e:
-        raise ValueError(f"Error processing skills with Groq: {str(e)}")
\ No newline at end of file
+    except (ValueError, AttributeError, TypeError) as e:
+        # Not JSON, or not the requested shape
+        raise LLMError(f"Error parsing JSON response: {str(e)}")
\ No newline at end of file
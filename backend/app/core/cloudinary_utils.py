@@ -1,14 +1,19 @@
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
+from functools import lru_cache
 from app.core.config import settings  # Use Pydantic settings
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.cloudinary_cloud_name,
-    api_key=settings.cloudinary_api_key,
-    api_secret=settings.cloudinary_api_secret
-)
+@lru_cache()
+def get_cloudinary():
+    """Import and configure Cloudinary on first use rather than at startup."""
+    import cloudinary
+    import cloudinary.uploader
+    import cloudinary.api
+
+    cloudinary.config(
+        cloud_name=settings.cloudinary_cloud_name,
+        api_key=settings.cloudinary_api_key,
+        api_secret=settings.cloudinary_api_secret
+    )
+    return cloudinary
 
 def upload_file_to_cloudinary(local_filepath: str, public_id: str = None, resource_type="auto"):
     """
@@ -17,7 +22,7 @@ def upload_file_to_cloudinary(local_filepath: str, public_id: str = None, resour
     - public_id: The ID to use for the uploaded file.
     - resource_type: The Cloudinary resource type (image, raw, etc.)
     """
-    response = cloudinary.uploader.upload(
+    response = get_cloudinary().uploader.upload(
         local_filepath, 
         public_id=public_id, 
         resource_type=resource_type
@@ -31,7 +36,7 @@ def delete_file_from_cloudinary(public_id: str, resource_type="auto"):
     - resource_type: The Cloudinary resource type (raw, image, video).
     """
     try:
-        response = cloudinary.uploader.destroy(public_id, resource_type=resource_type)
+        response = get_cloudinary().uploader.destroy(public_id, resource_type=resource_type)
         if response.get("result") == "ok":
             return True
         else:
@@ -42,4 +47,4 @@ def delete_file_from_cloudinary(public_id: str, resource_type="auto"):
 def delete_resource_from_cloudinary(resource_url: str):
     # Extract the public_id from the URL
     public_id = resource_url.split("/")[-1].split(".")[0]  # Extracts '1_template_1_pdf' from the URL
-    cloudinary.api.delete_resources([public_id])
\ No newline at end of file
+    get_cloudinary().api.delete_resources([public_id])
\ No newline at end of file
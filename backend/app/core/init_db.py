@@ -1,31 +1,54 @@
 # app/core/init_db.py
+import hashlib
 import json
 from pathlib import Path
+from sqlalchemy import func, inspect, select, text
 from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, dialect_insert
+from app.models.metadata import AppMetadata
 from app.models.template import PredefinedTemplate
-from app.models.skills import Skill, SkillCategory
+from app.models.skills import Skill, SkillCategory, UserSkill
+from app.core.settings import settings
+from app.services.skill_matcher import SKILL_KEY_VERSION, skill_key
+from app.services.skill_search import skill_fts
+from app.services.thumbnails import THUMBNAIL_WIDTHS
+from app.utils.latex import LatexCompiler
+from app.utils.pdf import thumbnail_cache
 from typing import Dict, List
 import logging
 from uuid import uuid4
 
 logger = logging.getLogger(__name__)
 
-async def load_skills_data() -> Dict[str, List[Dict]]:
-    """Load skills data from JSON files."""
+SKILL_SEED_FILES = {
+    'tech': 'techstack.json',
+    'soft': 'softskills.json',
+    'hard': 'hardskills.json',
+}
+SKILL_SEED_HASH_KEY = "skills_seed_hash"
+SKILL_KEY_VERSION_KEY = "skill_key_version"
+
+def read_skill_seed_files() -> Dict[str, bytes]:
+    """Raw contents of the skill seed files, by category."""
     data_dir = Path('app/data')
-    skills_data = {}
-    
+    return {
+        category: (data_dir / filename).read_bytes()
+        for category, filename in SKILL_SEED_FILES.items()
+    }
+
+def skill_seed_hash(raw_files: Dict[str, bytes]) -> str:
+    digest = hashlib.sha256()
+    for category, content in sorted(raw_files.items()):
+        digest.update(category.encode())
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+async def load_skills_data(raw_files: Dict[str, bytes] = None) -> Dict[str, List[Dict]]:
+    """Load skills data from JSON files."""
     try:
-        logger.info("Starting to load skills data files")
-        with open(data_dir / 'techstack.json', 'r') as f:
-            skills_data['tech'] = json.load(f)
-            logger.info(f"Loaded {len(skills_data['tech'])} tech skills")
-        with open(data_dir / 'softskills.json', 'r') as f:
-            skills_data['soft'] = json.load(f)
-            logger.info(f"Loaded {len(skills_data['soft'])} soft skills")
-        with open(data_dir / 'hardskills.json', 'r') as f:
-            skills_data['hard'] = json.load(f)
-            logger.info(f"Loaded {len(skills_data['hard'])} hard skills")
+        raw_files = raw_files or read_skill_seed_files()
+        skills_data = {category: json.loads(content) for category, content in raw_files.items()}
+        logger.info(", ".join(f"{len(skills)} {category}" for category, skills in skills_data.items()) + " seed skills loaded")
         return skills_data
     except FileNotFoundError as e:
         logger.error(f"Error loading skills data: {e}")
@@ -34,9 +57,104 @@ async def load_skills_data() -> Dict[str, List[Dict]]:
         logger.error(f"Error parsing JSON data: {e}")
         return None
 
+def migrate_skill_normalized_name(db: Session):
+    """
+    Add and backfill skill.normalized_name on databases created before it
+    existed, or recompute it when skill_key has changed since. Skills whose
+    names normalize to the same key are merged into the oldest one so the
+    unique index can be built; names without a key keep a NULL one.
+    """
+    columns = {column["name"] for column in inspect(db.get_bind()).get_columns("skill")}
+    if "normalized_name" not in columns:
+        logger.info("Adding skill.normalized_name")
+        db.execute(text("ALTER TABLE skill ADD COLUMN normalized_name VARCHAR"))
+
+    recorded = db.get(AppMetadata, SKILL_KEY_VERSION_KEY)
+    if not recorded or recorded.value != SKILL_KEY_VERSION:
+        logger.info(f"Recomputing skill.normalized_name for skill key version {SKILL_KEY_VERSION}")
+        # Old and new keys may swap between rows, so rebuild the index afterwards
+        db.execute(text("DROP INDEX IF EXISTS ix_skill_normalized_name"))
+        db.query(Skill).update({Skill.normalized_name: None}, synchronize_session=False)
+        if recorded:
+            recorded.value = SKILL_KEY_VERSION
+        else:
+            db.add(AppMetadata(key=SKILL_KEY_VERSION_KEY, value=SKILL_KEY_VERSION))
+
+    pending = db.query(Skill).filter(Skill.normalized_name.is_(None)).order_by(Skill.created_at).all()
+    if pending:
+        canonical = {
+            key: skill_id
+            for skill_id, key in db.query(Skill.id, Skill.normalized_name).filter(Skill.normalized_name.isnot(None))
+        }
+        merged = 0
+        for skill in pending:
+            key = skill_key(skill.name)
+            if not key:
+                continue
+            if key in canonical:
+                # Users rating both keep their rating of the canonical skill
+                already = select(UserSkill.user_id).where(UserSkill.skill_id == canonical[key])
+                db.query(UserSkill).filter(
+                    UserSkill.skill_id == skill.id, UserSkill.user_id.in_(already)
+                ).delete(synchronize_session=False)
+                db.query(UserSkill).filter(UserSkill.skill_id == skill.id).update(
+                    {UserSkill.skill_id: canonical[key]}, synchronize_session=False
+                )
+                db.delete(skill)
+                merged += 1
+            else:
+                skill.normalized_name = key
+                canonical[key] = skill.id
+        logger.info(f"Backfilled normalized names for {len(pending) - merged} skills, merged {merged} duplicates")
+
+    db.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_skill_normalized_name ON skill (normalized_name)"
+    ))
+    db.commit()
+
+def migrate_user_skill_unique(db: Session):
+    """Drop duplicate (user, skill) ratings, keeping the latest, then enforce uniqueness."""
+    indexes = {index["name"] for index in inspect(db.get_bind()).get_indexes("userskill")}
+    if "ix_userskill_user_skill" in indexes:
+        return
+    removed = db.execute(text("""
+        DELETE FROM userskill WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id, skill_id ORDER BY updated_at DESC
+                ) AS position
+                FROM userskill
+            ) AS ranked
+            WHERE position = 1
+        )
+    """)).rowcount
+    db.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_userskill_user_skill ON userskill (user_id, skill_id)"
+    ))
+    db.commit()
+    logger.info(f"Enforced one rating per user skill, removed {removed} duplicates")
+
 async def init_skills(db: Session):
-    """Initialize skills database with predefined skills"""
-    skills_data = await load_skills_data()
+    """
+    Initialize skills database with predefined skills.
+
+    Skipped outright while the seed files hash to what was seeded last time;
+    otherwise each category is upserted with a single bulk insert that leaves
+    existing skills alone.
+    """
+    try:
+        raw_files = read_skill_seed_files()
+    except FileNotFoundError as e:
+        logger.error(f"Error loading skills data: {e}")
+        return
+
+    seed_hash = skill_seed_hash(raw_files)
+    recorded = db.get(AppMetadata, SKILL_SEED_HASH_KEY)
+    if recorded and recorded.value == seed_hash:
+        logger.info("Skill seed data unchanged, skipping seeding")
+        return 0
+
+    skills_data = await load_skills_data(raw_files)
     if not skills_data:
         logger.error("Failed to load skills data")
         return
@@ -46,89 +164,44 @@ async def init_skills(db: Session):
         'soft': SkillCategory.SOFT,
         'hard': SkillCategory.HARD
     }
+    insert = dialect_insert(db)
 
     try:
-        added_skills = set()  # Keep track of skills we've already processed
-        
+        seen = set()  # A skill listed twice is only seeded once
+        existing = db.query(func.count(Skill.id)).scalar()
         for category, skills in skills_data.items():
-            logger.info(f"Processing {category} skills, total count: {len(skills)}")
-            
-            # Log first skill in each category to debug data structure
-            if skills:
-                logger.info(f"Sample {category} skill data: {skills[0]}")
-            
-            for index, skill_data in enumerate(skills):
-                try:
-                    # Log raw skill data
-                    logger.info(f"Processing {category} skill {index + 1}/{len(skills)}: {skill_data}")
-                    
-                    # Try both possible keys and log what we find
-                    tech_name = skill_data.get('technology')
-                    skill_name = skill_data.get('skill')
-                    logger.info(f"Found technology: {tech_name}, skill: {skill_name}")
-                    
-                    final_name = tech_name or skill_name
-                    if not final_name:
-                        logger.warning(f"No valid name found in skill data: {skill_data}")
-                        continue
-                    
-                    # Normalize skill name
-                    normalized_name = final_name.strip().lower()
-                    logger.info(f"Normalized name: {normalized_name}")
-                    
-                    # Skip if we've already processed this skill
-                    if normalized_name in added_skills:
-                        logger.info(f"Skipping duplicate skill: {normalized_name}")
-                        continue
-                    
-                    # Check if skill already exists in database
-                    existing_skill = db.query(Skill).filter(
-                        Skill.name.ilike(normalized_name)
-                    ).first()
-
-                    if existing_skill:
-                        logger.info(f"Skill already exists: {normalized_name}")
-                        continue
-
-                    # Create new skill
-                    new_skill = Skill(
-                        id=uuid4(),
-                        name=final_name,
-                        category=category_mapping[category],
-                        source="SEED"
-                    )
-                    
-                    logger.info(f"Adding new skill: {final_name} ({category})")
-                    db.add(new_skill)
-                    added_skills.add(normalized_name)
-
-                except Exception as e:
-                    logger.error(f"Error processing skill: {str(e)}", exc_info=True)
+            rows = []
+            for skill_data in skills:
+                final_name = (skill_data.get('technology') or skill_data.get('skill') or '').strip()
+                normalized_name = skill_key(final_name)
+                if not normalized_name or normalized_name in seen:
                     continue
+                seen.add(normalized_name)
+                rows.append({
+                    "name": final_name,
+                    "normalized_name": normalized_name,
+                    "category": category_mapping[category],
+                    "description": skill_data.get('description'),
+                    "source": "SEED"
+                })
+            if rows:
+                # Skills that already exist, by name or normalized name, are left as they are
+                db.execute(insert(Skill).on_conflict_do_nothing(), rows)
 
-            try:
-                logger.info(f"Flushing {category} skills...")
-                db.flush()
-                logger.info(f"Successfully flushed {category} skills")
-            except Exception as e:
-                logger.error(f"Error flushing {category} skills: {str(e)}", exc_info=True)
-                db.rollback()
-
-        try:
-            logger.info(f"Committing {len(added_skills)} skills to database...")
-            db.commit()
-            logger.info(f"Successfully committed {len(added_skills)} skills")
-        except Exception as e:
-            logger.error(f"Error during final commit: {str(e)}", exc_info=True)
-            db.rollback()
-            raise
+        if recorded:
+            recorded.value = seed_hash
+        else:
+            db.add(AppMetadata(key=SKILL_SEED_HASH_KEY, value=seed_hash))
+        added = db.query(func.count(Skill.id)).scalar() - existing
+        db.commit()
+        logger.info(f"Seeded {added} new skills from {len(seen)} seed entries")
 
     except Exception as e:
         db.rollback()
         logger.error(f"Error seeding skills: {e}", exc_info=True)
         raise
 
-    return len(added_skills)
+    return added
 
 async def init_predefined_templates(db: Session):
     """Initialize predefined templates from data/resume folder"""
@@ -176,10 +249,30 @@ async def init_predefined_templates(db: Session):
         logger.error(f"Error initializing predefined templates: {e}")
         raise
 
+async def warm_predefined_thumbnails():
+    """Render predefined template thumbnails ahead of the first request; run in the background"""
+    db = SessionLocal()
+    try:
+        templates = [(template.name, template.content) for template in db.query(PredefinedTemplate).all()]
+    finally:
+        db.close()
+    for name, content in templates:
+        try:
+            with await LatexCompiler.open_compiled_pdf(content) as pdf_file:
+                for width in THUMBNAIL_WIDTHS:
+                    await thumbnail_cache.render(pdf_file, width)
+        except Exception as e:
+            logger.warning(f"Could not render thumbnail for template {name}: {e}")
+
 async def init_db(db: Session):
     """Initialize all database components"""
     try:
         await init_predefined_templates(db)
+        migrate_skill_normalized_name(db)
+        migrate_user_skill_unique(db)
+        if settings.SKILL_SEARCH_BACKEND == "auto":
+            # Before seeding, so the triggers index new skills as they are added
+            skill_fts.install(db.get_bind())
         await init_skills(db)
         logger.info("Database initialization completed successfully")
     except Exception as e:
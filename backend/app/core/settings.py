@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -21,6 +23,59 @@ class Settings(BaseSettings):
     GITHUB_TOKEN: str
     GROQ_API_KEY: str
 
+    # LaTeX compilation
+    COMPILE_WORKERS: int = os.cpu_count() or 1
+    COMPILE_QUEUE_DEPTH: int = 32
+    COMPILE_TIMEOUT: int = 30  # seconds of wall-clock time per compile
+    PREVIEW_DEBOUNCE_MS: int = 200
+    COMPILE_SANDBOX_ROOT: str = ""  # empty: /dev/shm when available, else the temp dir
+    BATCH_COMPILE_CONCURRENCY: int = 0  # 0: every compile worker but one
+    BATCH_COMPILE_MAX_ITEMS: int = 50
+
+    # Cold start: python -m app.core.startup_report fails above this
+    STARTUP_IMPORT_BUDGET_MS: int = 1500
+
+    # Skill search
+    SKILL_INDEX_REFRESH_SECONDS: int = 60  # how often to look for skills added by other workers
+    SKILL_MATCH_MAX_DISTANCE: int = 1  # typos tolerated when matching new skill names to existing ones
+    SKILL_SEARCH_BACKEND: str = "auto"  # auto: database full-text search when supported; memory: index only
+    SPACY_MODEL: str = "en_core_web_md"  # loaded on first use, for word vectors only
+
+    # Related skills: memory-mapped embeddings shared by every worker on the host
+    SKILL_EMBEDDINGS_DIR: str = os.path.join(tempfile.gettempdir(), "resarch-skill-embeddings")
+    SKILL_EMBEDDINGS_IVF_MIN_SKILLS: int = 50000  # partition catalogs this large into IVF lists
+    SKILL_EMBEDDINGS_NPROBE: int = 8  # IVF lists scanned per query
+
+    # LLM provider calls (OpenAI-compatible chat completions)
+    GROQ_BASE_URL: str = "https://api.groq.com/openai/v1"  # python -m app.services.fake_llm_server serves http://127.0.0.1:8089/v1
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_MAX_CONCURRENCY: int = 8  # in-flight calls (and pooled connections) per worker
+    LLM_MAX_RETRIES: int = 3
+    LLM_BREAKER_FAILURES: int = 5  # consecutive failures that open the circuit
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Cached LLM skill extractions, shared through the database
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+
+    # Compiled PDF cache
+    PDF_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "resarch-pdf-cache")
+    PDF_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PDF_CACHE_MEMORY_ITEMS: int = 64
+
+    # Page-1 thumbnails of compiled PDFs
+    THUMBNAIL_DIR: str = os.path.join(tempfile.gettempdir(), "resarch-thumbnails")
+    THUMBNAIL_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # TeX engine: pdflatex, lualatex, xelatex, or auto (fastest per template)
+    LATEX_ENGINE: str = "auto"
+    LATEX_ENGINE_SELECTION_FILE: str = os.path.join(tempfile.gettempdir(), "resarch-engine-selection.json")
+
+    # Precompiled preamble formats for the bundled templates
+    LATEX_PRECOMPILE_FORMATS: bool = True
+    LATEX_FORMAT_DIR: str = os.path.join(tempfile.gettempdir(), "resarch-latex-formats")
+
     # Cloudinary
     cloudinary_cloud_name: str
     cloudinary_api_key: str
@@ -1,24 +1,54 @@
 # app/core/skill_categorization.py
 import json
-import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
-import spacy
+from typing import Dict, List, Optional, Tuple
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from app.core.settings import settings
 from app.models.skills import SkillCategory
 
+# Category keys in the order their rows are stacked in the skill matrix
+CATEGORY_MAPPING = {
+    'tech': SkillCategory.TECHNICAL,
+    'soft': SkillCategory.SOFT,
+    'hard': SkillCategory.HARD
+}
+
+# Below this best similarity a skill defaults to HARD
+MIN_SIMILARITY = 0.1
+# Skills vectorized per sparse product in categorize_many
+BATCH_SIZE = 2048
+# Nothing here tags, parses or recognizes entities; word vectors live in the
+# vocab and need none of these
+SPACY_UNUSED_PIPES = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"]
+
 class SkillCategorizer:
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_md")  # Medium-sized English model with word vectors
         self.skills_data = self._load_skills_data()
+
+        # One vocabulary for every known skill; rows are grouped by category
+        texts = []
+        self.categories: List[str] = []
+        category_starts = []
+        self.exact_matches: Dict[str, SkillCategory] = {}
+        for key, category in CATEGORY_MAPPING.items():
+            skills_list = self.skills_data[key]
+            if not skills_list:
+                continue
+            self.categories.append(key)
+            category_starts.append(len(texts))
+            for item in skills_list:
+                name = item.get('skill', item.get('technology', ''))
+                # Combine skill names and descriptions for better context
+                texts.append(f"{name} {item['description']}")
+                # Earlier categories win, as tech is checked before soft before hard
+                self.exact_matches.setdefault(name.lower(), category)
+
         self.vectorizer = TfidfVectorizer(stop_words='english')
-        
-        # Create vectorized representations of our known skills
-        self.tech_vectors = self._vectorize_skills(self.skills_data['tech'])
-        self.soft_vectors = self._vectorize_skills(self.skills_data['soft'])
-        self.hard_vectors = self._vectorize_skills(self.skills_data['hard'])
+        # Rows are L2-normalized, so a dot product is a cosine similarity
+        self.skill_matrix = self.vectorizer.fit_transform(texts).tocsr()
+        self.category_starts = np.array(category_starts)
 
     def _load_skills_data(self) -> Dict[str, List[Dict]]:
         """Load skills data from JSON files."""
@@ -37,47 +67,39 @@ class SkillCategorizer:
             'hard': hard_skills
         }
 
-    def _vectorize_skills(self, skills_list: List[Dict]) -> np.ndarray:
-        """Create TF-IDF vectors for a list of skills."""
-        # Combine skill names and descriptions for better context
-        texts = [f"{item.get('skill', item.get('technology', ''))} {item['description']}" 
-                for item in skills_list]
-        return self.vectorizer.fit_transform(texts)
+    def _category_maxima(self, similarities: np.ndarray) -> np.ndarray:
+        """Best similarity per category for each row of a (skills x known skills) array."""
+        return np.maximum.reduceat(similarities, self.category_starts, axis=-1)
 
-    def _get_similarity_scores(self, skill: str) -> Dict[str, float]:
-        """Calculate similarity scores for a skill against each category."""
-        # Preprocess the input skill
-        skill_doc = self.nlp(skill.lower())
-        skill_vector = self.vectorizer.transform([skill_doc.text])
+    def _check_exact_matches(self, skill: str) -> Optional[SkillCategory]:
+        """Check for exact matches in our skills data."""
+        return self.exact_matches.get(skill.lower())
 
-        # Calculate cosine similarity with each category
-        tech_sim = cosine_similarity(skill_vector, self.tech_vectors).max()
-        soft_sim = cosine_similarity(skill_vector, self.soft_vectors).max()
-        hard_sim = cosine_similarity(skill_vector, self.hard_vectors).max()
+    def categorize_many(self, skill_names: List[str]) -> List[Tuple[SkillCategory, float]]:
+        """
+        Categorize many skills at once, returning (category, confidence) for
+        each. Exact matches have confidence 1.0; otherwise it is the best
+        cosine similarity to a known skill of that category.
+        """
+        results: List[Tuple[SkillCategory, float]] = []
+        for start in range(0, len(skill_names), BATCH_SIZE):
+            batch = skill_names[start:start + BATCH_SIZE]
+            vectors = self.vectorizer.transform([name.lower() for name in batch])
 
-        return {
-            'tech': float(tech_sim),
-            'soft': float(soft_sim),
-            'hard': float(hard_sim)
-        }
+            # (batch x known skills) similarities in one product, then per-category maxima
+            maxima = self._category_maxima((vectors @ self.skill_matrix.T).toarray())
+            best = maxima.argmax(axis=1)
+            scores = maxima[np.arange(len(batch)), best]
 
-    def _check_exact_matches(self, skill: str) -> Optional[SkillCategory]:
-        """Check for exact matches in our skills data."""
-        skill_lower = skill.lower()
-        
-        # Check in tech skills
-        if any(s.get('technology', '').lower() == skill_lower for s in self.skills_data['tech']):
-            return SkillCategory.TECHNICAL
-            
-        # Check in soft skills
-        if any(s['skill'].lower() == skill_lower for s in self.skills_data['soft']):
-            return SkillCategory.SOFT
-            
-        # Check in hard skills
-        if any(s['skill'].lower() == skill_lower for s in self.skills_data['hard']):
-            return SkillCategory.HARD
-            
-        return None
+            for name, index, score in zip(batch, best, scores):
+                exact_match = self._check_exact_matches(name)
+                if exact_match is not None:
+                    results.append((exact_match, 1.0))
+                elif score < MIN_SIMILARITY:
+                    results.append((SkillCategory.HARD, float(score)))
+                else:
+                    results.append((CATEGORY_MAPPING[self.categories[index]], float(score)))
+        return results
 
     def infer_category(self, skill_name: str) -> SkillCategory:
         """
@@ -89,35 +111,28 @@ class SkillCategorizer:
         Returns:
             SkillCategory: The inferred category of the skill
         """
-        # First check for exact matches
-        exact_match = self._check_exact_matches(skill_name)
-        if exact_match is not None:
-            return exact_match
+        return self.categorize_many([skill_name])[0][0]
 
-        # Calculate similarity scores
-        similarity_scores = self._get_similarity_scores(skill_name)
-        
-        # Get the category with the highest similarity score
-        max_category = max(similarity_scores.items(), key=lambda x: x[1])
-        
-        # Map the category to SkillCategory enum
-        category_mapping = {
-            'tech': SkillCategory.TECHNICAL,
-            'soft': SkillCategory.SOFT,
-            'hard': SkillCategory.HARD
-        }
-        
-        # If the highest similarity score is too low, default to HARD
-        if max_category[1] < 0.1:  # Threshold can be adjusted
-            return SkillCategory.HARD
-            
-        return category_mapping[max_category[0]]
+@lru_cache()
+def get_nlp():
+    """The spaCy model, loaded on first use with only its tokenizer and vectors."""
+    import spacy
+    return spacy.load(settings.SPACY_MODEL, exclude=SPACY_UNUSED_PIPES)
+
+@lru_cache()
+def get_categorizer() -> SkillCategorizer:
+    """The shared categorizer, built on first use (or in the gunicorn master when preloading)."""
+    return SkillCategorizer()
 
-# Create a singleton instance
-categorizer = SkillCategorizer()
+def __getattr__(name: str):
+    # Keeps `from app.core.skill_categorization import categorizer` working without
+    # building the categorizer at import time
+    if name == "categorizer":
+        return get_categorizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def infer_skill_category(skill_name: str) -> SkillCategory:
     """
     Wrapper function to infer skill category using the singleton categorizer instance.
     """
-    return categorizer.infer_category(skill_name)
\ No newline at end of file
+    return get_categorizer().infer_category(skill_name)
\ No newline at end of file
@@ -0,0 +1,132 @@
+# app/core/startup_report.py
+"""
+Cold-start import report for the API.
+
+    python -m app.core.startup_report [--top 25] [--budget-ms 1500]
+        [--warm app.core.skill_categorization:get_categorizer]
+
+Imports ``app.main`` in a fresh interpreter under ``-X importtime``, prints
+the slowest modules and top-level packages, and exits with status 1 when the
+total is over budget (STARTUP_IMPORT_BUDGET_MS by default). It also reports
+what a worker costs: import time and peak RSS, then the time and RSS after
+each ``--warm`` callable (what a preloading gunicorn master does once).
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportTiming]:
+    timings = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            # Nesting is shown as two extra spaces per level
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    """Self time summed per top-level package, in microseconds."""
+    totals: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        totals[timing.module.split(".")[0]] += timing.self_us
+    return dict(totals)
+
+
+def measure(target: str = "app.main") -> List[ImportTiming]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+# Runs in a fresh interpreter; ru_maxrss is in KiB on Linux
+FOOTPRINT_SCRIPT = """
+import importlib, json, resource, sys, time
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+steps = []
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+steps.append(["import " + sys.argv[1], time.perf_counter() - started, rss_mb()])
+for spec in sys.argv[2:]:
+    module, _, attr = spec.partition(":")
+    started = time.perf_counter()
+    getattr(importlib.import_module(module), attr)()
+    steps.append([spec, time.perf_counter() - started, rss_mb()])
+print(json.dumps(steps))
+"""
+
+
+def measure_footprint(target: str = "app.main", warm: List[str] = ()) -> List[Tuple[str, float, float]]:
+    """(step, seconds, peak RSS in MB) for importing ``target`` and then calling each ``warm`` callable."""
+    result = subprocess.run(
+        [sys.executable, "-c", FOOTPRINT_SCRIPT, target, *warm],
+        capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Measuring {target} failed:\n{result.stderr[-2000:]}")
+    return [tuple(step) for step in json.loads(result.stdout.strip().splitlines()[-1])]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--warm", action="append", default=[], metavar="MODULE:FUNCTION",
+                        help="callable to time after the import, e.g. a lazy model loader")
+    args = parser.parse_args(argv)
+
+    if args.budget_ms is None:
+        from app.core.settings import settings
+        args.budget_ms = settings.STARTUP_IMPORT_BUDGET_MS
+
+    timings = measure(args.target)
+    total_ms = next(
+        (timing.cumulative_us for timing in timings if timing.module == args.target and timing.depth == 0),
+        sum(timing.self_us for timing in timings)
+    ) / 1000
+
+    print(f"Slowest modules (cumulative ms) importing {args.target}:")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:args.top]:
+        print(f"  {timing.cumulative_us / 1000:9.1f}  {timing.module}")
+    print("Top-level packages (self ms):")
+    packages = sorted(by_package(timings).items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in packages[:args.top]:
+        print(f"  {self_us / 1000:9.1f}  {package}")
+
+    print("Worker footprint:")
+    for step, seconds, rss_mb in measure_footprint(args.target, args.warm):
+        print(f"  {seconds * 1000:9.1f} ms  {rss_mb:7.1f} MB peak RSS  {step}")
+
+    print(f"Total: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if total_ms > args.budget_ms:
+        print("Over the cold-start budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
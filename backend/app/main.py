@@ -1,10 +1,19 @@
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import API_TITLE, API_DESCRIPTION, VERSION, API_V1_STR, BACKEND_CORS_ORIGINS
 from app.core.database import engine, SessionLocal
 from app.models import Base
 from app.api.v1 import api_router
-from app.core.init_db import init_db
+from app.api.v1.skills import get_groq_client
+from app.core.init_db import init_db, warm_predefined_thumbnails
+from app.core.settings import settings
+from app.utils.latex import compile_pool, sandbox_pool, latex_engine
+from app.utils.pdf import format_cache
+from pathlib import Path
+import asyncio
 import logging
 
 # Set up logging
@@ -14,6 +23,9 @@ logger = logging.getLogger(__name__)
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Per-module breakdown: python -m app.core.startup_report
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
 app = FastAPI(
     title=API_TITLE,
     description=API_DESCRIPTION,
@@ -33,6 +45,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -41,6 +54,7 @@ app.include_router(api_router, prefix=API_V1_STR)
 @app.on_event("startup")
 async def startup_event():
     """Initialize application on startup"""
+    logger.info(f"App modules imported in {IMPORT_SECONDS * 1000:.0f} ms")
     try:
         db = SessionLocal()
         await init_db(db)  # This will call both template and skills initialization
@@ -50,6 +64,23 @@ async def startup_event():
     finally:
         db.close()
 
+    # Thumbnails are also rendered on demand; this only saves the first visitors the wait
+    asyncio.ensure_future(warm_predefined_thumbnails())
+
+    if settings.LATEX_PRECOMPILE_FORMATS:
+        # Build preamble formats for the bundled templates in the background
+        count = format_cache.register_directory(Path('app/data/resumes'))
+        logger.info(f"Registered {count} template preambles for precompilation")
+        asyncio.ensure_future(format_cache.warm())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop compile workers, kill any pdflatex still running, drop scratch space and close LLM connections"""
+    await latex_engine.shutdown()
+    await compile_pool.shutdown()
+    sandbox_pool.close()
+    await get_groq_client().aclose()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Resume Architect API"}
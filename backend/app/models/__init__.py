@@ -4,6 +4,8 @@ from .skills import Skill, UserSkill, SkillCategory
 from .template import Template
 from .resume import Resume
 from .profile import UserProfile, WorkExperience  # Add this
+from .metadata import AppMetadata
+from .llm_cache import LLMExtraction
 
 # For easy importing
 __all__ = [
@@ -16,5 +18,7 @@ __all__ = [
     'Template',
     'Resume',
     'UserProfile',  # Add this
-    'WorkExperience'  # Add this
+    'WorkExperience',  # Add this
+    'AppMetadata',
+    'LLMExtraction'
 ]
\ No newline at end of file
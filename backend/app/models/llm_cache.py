@@ -0,0 +1,17 @@
+# models/llm_cache.py
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Float, Integer, DateTime
+from app.core.database import Base
+
+class LLMExtraction(Base):
+    """An LLM skill extraction, keyed by a fingerprint of the text, model and prompt version."""
+    __tablename__ = "llm_extraction_cache"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    result = Column(Text, nullable=False)  # JSON list of [skill name, category]
+    latency_seconds = Column(Float, nullable=False, default=0.0)  # what the LLM call took
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,12 @@
+# models/metadata.py
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from app.core.database import Base
+
+class AppMetadata(Base):
+    """Key/value facts about the database itself, e.g. which seed data it holds."""
+    __tablename__ = "app_metadata"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
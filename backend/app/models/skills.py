@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Enum, ForeignKey, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Enum, ForeignKey, Float, Index
+from sqlalchemy.orm import relationship, validates
 from .base import BaseModel, SQLiteUUID  # Import SQLiteUUID from base
+from app.services.skill_matcher import skill_key
 import enum
 
 class SkillCategory(enum.Enum):
@@ -8,16 +9,37 @@ class SkillCategory(enum.Enum):
     TECHNICAL = "technical"
     HARD = "hard"
 
+def _normalized_name(context):
+    return skill_key(context.get_current_parameters()["name"]) or None
+
 class Skill(BaseModel):
     name = Column(String, unique=True, nullable=False)
+    # Case/spacing/punctuation-folded name for equality lookups; kept in
+    # step with name by the validator below and, for bulk inserts, the default.
+    # NULL (never unique-checked) for names of punctuation alone
+    normalized_name = Column(String, nullable=True, default=_normalized_name)
     category = Column(Enum(SkillCategory), nullable=False)
     source = Column(String, nullable=True)
     description = Column(String, nullable=True)
 
+    __table_args__ = (
+        Index("ix_skill_normalized_name", "normalized_name", unique=True),
+    )
+
+    @validates("name")
+    def _set_normalized_name(self, key, name):
+        self.normalized_name = skill_key(name) or None
+        return name
+
 class UserSkill(BaseModel):
     user_id = Column(SQLiteUUID(), ForeignKey("user.id"), nullable=False)
     skill_id = Column(SQLiteUUID(), ForeignKey("skill.id"), nullable=False)
     rating = Column(Float, nullable=False, default=5.0)
 
     skill = relationship("Skill", backref="user_skills", lazy="joined")
-    user = relationship("User", back_populates="skills")
\ No newline at end of file
+    user = relationship("User", back_populates="skills")
+
+    # One rating per user and skill; lets batch saves upsert
+    __table_args__ = (
+        Index("ix_userskill_user_skill", "user_id", "skill_id", unique=True),
+    )
\ No newline at end of file
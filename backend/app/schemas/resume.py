@@ -1,6 +1,6 @@
 # schemas/resume.py
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List, Dict
 from datetime import datetime
 from uuid import UUID
 
@@ -25,4 +25,14 @@ class LatexCompileRequest(BaseModel):
     content: str
 
 class CompileResponse(BaseModel):
-    message: str
\ No newline at end of file
+    message: str
+
+class BatchCompileItem(BaseModel):
+    name: Optional[str] = None
+    # Either a full LaTeX source, or values for the request's template placeholders
+    content: Optional[str] = None
+    parameters: Optional[Dict[str, str]] = None
+
+class BatchCompileRequest(BaseModel):
+    template: Optional[str] = None  # LaTeX with {{placeholder}} fields
+    items: List[BatchCompileItem]
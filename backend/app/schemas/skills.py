@@ -1,6 +1,6 @@
 # schemas/skills.py
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from pydantic import BaseModel, Field, StringConstraints
+from typing import Annotated, Optional, List, Dict
 from uuid import UUID
 from enum import Enum
 
@@ -50,4 +50,19 @@ class BatchSkillsByCategory(BaseModel):
 class SingleSkillCreate(BaseModel):
     name: str
     rating: float = Field(ge=1, le=10)
-    category: SkillCategory
\ No newline at end of file
+    category: SkillCategory
+
+class SkillCategorizeRequest(BaseModel):
+    # Blank names are rejected rather than categorized as HARD with no evidence
+    names: List[Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]] = Field(
+        min_length=1, max_length=5000
+    )
+
+class SkillCategorization(BaseModel):
+    name: str
+    category: SkillCategory
+    confidence: float
+
+class RelatedSkill(BaseModel):
+    skill: Skill
+    score: float
\ No newline at end of file
@@ -0,0 +1,242 @@
+# app/services/compile_pool.py
+import asyncio
+import logging
+import os
+import signal
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class CompileQueueFull(Exception):
+    """Raised when a job is submitted while every worker is busy and the queue is full."""
+
+
+class CompileTimeout(Exception):
+    """Raised when a job exceeds its wall-clock budget and its processes were killed."""
+
+
+@dataclass
+class ProcessResult:
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+class LatencyStats:
+    """Rolling window of durations (in seconds) with simple summary statistics."""
+
+    def __init__(self, window: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4),
+            "p50": round(percentile(0.50), 4),
+            "p95": round(percentile(0.95), 4),
+            "max": round(samples[-1], 4),
+        }
+
+
+async def run_process(
+    args: Sequence[str],
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> ProcessResult:
+    """
+    Run a command as an asyncio subprocess in its own process group.
+
+    If the awaiting task is cancelled (timeout, superseded request, shutdown)
+    the whole process group is killed so no orphaned TeX children survive.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        cwd=cwd,
+        env=env,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        _kill_process_group(process)
+        await process.wait()
+        raise
+    return ProcessResult(
+        returncode=process.returncode,
+        stdout=stdout.decode(errors="replace"),
+        stderr=stderr.decode(errors="replace"),
+    )
+
+
+def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    except OSError:
+        # Fall back to the direct child if the group is already gone
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+@dataclass
+class _Job:
+    factory: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    timeout: float
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class CompilePool:
+    """
+    Fixed number of asyncio workers consuming a bounded job queue.
+
+    A job is any coroutine factory (usually one that spawns pdflatex through
+    `run_process`). Submitting while the queue is full fails fast with
+    `CompileQueueFull`; a job running longer than its timeout is cancelled,
+    which kills its process group, and the caller gets `CompileTimeout`.
+    """
+
+    def __init__(self, workers: int, queue_depth: int, timeout: float):
+        self.workers = max(1, workers)
+        self.queue_depth = max(0, queue_depth)
+        self.timeout = timeout
+        self.queue_wait = LatencyStats()
+        self.compile_time = LatencyStats()
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+        self._running = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        # Loop the workers run on, once started
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> None:
+        # Restarted when used from a new loop, e.g. after asyncio.run in a script
+        if self._queue is not None and self.loop is asyncio.get_running_loop():
+            return
+        # Workers take jobs off the queue, so maxsize bounds only waiting jobs
+        # (asyncio treats maxsize=0 as unbounded, hence the floor of one)
+        self._queue = asyncio.Queue(maxsize=max(1, self.queue_depth))
+        self.loop = asyncio.get_running_loop()
+        self._tasks = [
+            asyncio.ensure_future(self._worker(index)) for index in range(self.workers)
+        ]
+        logger.info(
+            f"Started compile pool with {self.workers} workers, queue depth {self.queue_depth}"
+        )
+
+    async def submit(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Queue a job and wait for its result."""
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        job = _Job(
+            factory=factory,
+            future=loop.create_future(),
+            timeout=timeout or self.timeout,
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise CompileQueueFull("Compile queue is full")
+        # Cancelling the caller cancels the future, which the worker notices
+        return await job.future
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.future.cancelled():
+                    continue
+                self.queue_wait.record(time.monotonic() - job.enqueued_at)
+                await self._run_job(job)
+            except Exception as e:
+                logger.error(f"Compile worker {index} failed: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: _Job) -> None:
+        task = asyncio.ensure_future(job.factory())
+        job.future.add_done_callback(lambda f: task.cancel() if f.cancelled() else None)
+
+        self._running += 1
+        started = time.monotonic()
+        try:
+            try:
+                done, _ = await asyncio.wait({task}, timeout=job.timeout)
+            except asyncio.CancelledError:
+                # Pool shutdown: take the running job down with the worker
+                task.cancel()
+                raise
+            if not done:
+                task.cancel()
+                await asyncio.wait({task})
+                self.timeouts += 1
+                if not job.future.done():
+                    job.future.set_exception(
+                        CompileTimeout(f"Compilation exceeded {job.timeout:.0f}s")
+                    )
+                return
+        finally:
+            self._running -= 1
+            self.compile_time.record(time.monotonic() - started)
+
+        if task.cancelled() or job.future.done():
+            return
+        if task.exception() is not None:
+            self.failures += 1
+            job.future.set_exception(task.exception())
+        else:
+            job.future.set_result(task.result())
+
+    def stats(self) -> Dict[str, Any]:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "cpu_count": os.cpu_count(),
+            "running": self._running,
+            "queued": queued,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "queue_wait": self.queue_wait.snapshot(),
+            "compile_time": self.compile_time.snapshot(),
+        }
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self.loop = None
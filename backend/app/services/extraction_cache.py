@@ -0,0 +1,129 @@
+# app/services/extraction_cache.py
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models.llm_cache import LLMExtraction
+from app.models.skills import SkillCategory
+
+logger = logging.getLogger(__name__)
+
+CategorizedSkills = List[Tuple[str, SkillCategory]]
+
+
+class ExtractionCache:
+    """
+    LLM skill extractions stored in the database, so every worker shares them.
+
+    Entries are keyed by a hash of the resume text (whitespace-folded), the
+    model and the prompt version, expire ``ttl_seconds`` after they were
+    stored, and beyond ``max_entries`` the least recently used are dropped.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(text: str, model: str, prompt_version: str) -> str:
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{model}\n{prompt_version}\n{normalized}".encode()).hexdigest()
+
+    def _expiry_cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+
+    def get(self, db: Session, key: str) -> Optional[CategorizedSkills]:
+        """The cached extraction for ``key``, or None if there is none or it has expired."""
+        entry = db.get(LLMExtraction, key)
+        if entry is None or entry.created_at < self._expiry_cutoff():
+            with self._lock:
+                self.misses += 1
+            return None
+
+        skills = [(name, SkillCategory(category)) for name, category in json.loads(entry.result)]
+        latency = entry.latency_seconds
+        db.execute(
+            update(LLMExtraction)
+            .where(LLMExtraction.key == key)
+            .values(hits=LLMExtraction.hits + 1, last_used_at=datetime.utcnow())
+        )
+        db.commit()
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += latency
+        return skills
+
+    def put(
+        self, db: Session, key: str, model: str, prompt_version: str,
+        skills: CategorizedSkills, latency_seconds: float
+    ) -> None:
+        """Store an extraction (replacing any expired one), then trim the table to its bounds."""
+        now = datetime.utcnow()
+        values = {
+            "key": key,
+            "model": model,
+            "prompt_version": prompt_version,
+            "result": json.dumps([[name, category.value] for name, category in skills]),
+            "latency_seconds": latency_seconds,
+            "hits": 0,
+            "created_at": now,
+            "last_used_at": now,
+        }
+        insert = dialect_insert(db)
+        statement = insert(LLMExtraction).values(**values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[LLMExtraction.key],
+            set_={column: statement.excluded[column] for column in values if column != "key"}
+        ))
+
+        evicted = db.execute(delete(LLMExtraction).where(LLMExtraction.created_at < self._expiry_cutoff())).rowcount
+        excess = db.query(func.count(LLMExtraction.key)).scalar() - self.max_entries
+        if excess > 0:
+            oldest = select(LLMExtraction.key).order_by(LLMExtraction.last_used_at).limit(excess)
+            evicted += db.execute(
+                delete(LLMExtraction).where(LLMExtraction.key.in_(oldest.scalar_subquery()))
+            ).rowcount
+        db.commit()
+
+        with self._lock:
+            self.stores += 1
+            self.evictions += evicted
+        if evicted:
+            logger.info(f"Evicted {evicted} cached LLM extractions")
+
+    def stats(self, db: Session) -> Dict[str, Any]:
+        entries, hits, saved = db.execute(select(
+            func.count(LLMExtraction.key),
+            func.coalesce(func.sum(LLMExtraction.hits), 0),
+            func.coalesce(func.sum(LLMExtraction.hits * LLMExtraction.latency_seconds), 0.0),
+        )).one()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "estimated_llm_seconds_saved": round(self.saved_seconds, 2),
+                # Across every worker, for the entries still cached
+                "shared": {
+                    "entries": entries,
+                    "max_entries": self.max_entries,
+                    "hits": hits,
+                    "estimated_llm_seconds_saved": round(saved, 2),
+                },
+            }
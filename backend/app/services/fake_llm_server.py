@@ -0,0 +1,112 @@
+# app/services/fake_llm_server.py
+"""
+Local stand-in for an OpenAI-compatible chat completions API, so the skill
+extraction path can be tested and load-tested offline.
+
+    python -m app.services.fake_llm_server [--port 8089] [--latency-ms 800]
+        [--jitter-ms 200] [--failure-rate 0.05]
+
+Run the API against it with GROQ_BASE_URL=http://127.0.0.1:8089/v1. Replies
+to the extraction prompt list the bundled skills (app/data/*.json) that
+appear in the resume text, in the JSON shape the real prompt asks for.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+SKILL_FILES = {
+    "technical_skills": "techstack.json",
+    "soft_skills": "softskills.json",
+    "hard_skills": "hardskills.json",
+}
+RESUME_TEXT = re.compile(r"Resume Text:(.*?)(?:Provide the output|\Z)", re.DOTALL)
+
+
+@lru_cache()
+def skill_patterns() -> List[Tuple[str, Pattern]]:
+    data_dir = Path(__file__).parent.parent / "data"
+    patterns = []
+    for key, filename in SKILL_FILES.items():
+        with open(data_dir / filename) as f:
+            names = [item.get("skill", item.get("technology", "")) for item in json.load(f)]
+        # Longest names first, so "Machine Learning" wins over "Learning"
+        alternatives = "|".join(re.escape(name) for name in sorted(filter(None, names), key=len, reverse=True))
+        patterns.append((key, re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE)))
+    return patterns
+
+
+def fake_extraction(prompt: str) -> Dict[str, List[str]]:
+    """Known skills mentioned in the resume part of an extraction prompt, by category."""
+    match = RESUME_TEXT.search(prompt)
+    text = match.group(1) if match else prompt
+    result = {}
+    for key, pattern in skill_patterns():
+        found = {}
+        for name in pattern.findall(text):
+            found.setdefault(name.lower(), name)
+        result[key] = list(found.values())
+    return result
+
+
+def create_app(
+    latency_ms: float = 0, jitter_ms: float = 0, failure_rate: float = 0.0, seed: Optional[int] = None
+) -> FastAPI:
+    app = FastAPI(title="Fake LLM provider")
+    rng = random.Random(seed)
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        delay = latency_ms + rng.uniform(-jitter_ms, jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if rng.random() < failure_rate:
+            return JSONResponse(status_code=503, content={"error": {"message": "Simulated provider outage"}})
+
+        prompt = body["messages"][-1]["content"]
+        content = json.dumps(fake_extraction(prompt))
+        return {
+            "id": f"chatcmpl-fake-{app.state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split())},
+        }
+
+    return app
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run(
+        create_app(args.latency_ms, args.jitter_ms, args.failure_rate),
+        host=args.host, port=args.port, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+# app/services/latex_engines.py
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+from app.services.compile_pool import CompilePool, CompileQueueFull, run_process
+from app.services.latex_formats import FormatCache, preamble_hash, split_preamble
+from app.services.pdf_cache import PdfCache
+from app.services.sandbox import SandboxPool
+
+logger = logging.getLogger(__name__)
+
+# Requests for another run from LaTeX, hyperref, rerunfilecheck, lastpage, ...
+RERUN_PATTERN = re.compile(r"Rerun to get|Please rerun|Rerun LaTeX|may have changed\.\s*Rerun")
+MAX_LATEX_PASSES = 3
+# Templates whose engine choice is remembered; the least recently benchmarked go first
+MAX_ENGINE_SELECTIONS = 256
+
+# Histogram of engine runs per successful compile, across all compile paths
+compile_passes = Counter()
+
+
+class LatexCompileError(Exception):
+    """The document itself failed to compile (as opposed to a busy or timed-out pool)."""
+
+
+def read_aux(aux_path: str) -> Optional[bytes]:
+    """Return the contents of an .aux file, or None if it does not exist."""
+    try:
+        with open(aux_path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def needs_rerun(log_text: str, aux_before: Optional[bytes], aux_after: Optional[bytes]) -> bool:
+    """
+    Decide whether another pass is needed: either the log asks for one, or
+    an .aux file that existed before the pass was changed by it.
+    """
+    # TeX hard-wraps log lines at 79 characters, possibly mid-word
+    if RERUN_PATTERN.search(log_text.replace("\n", "")):
+        return True
+    return aux_before is not None and aux_before != aux_after
+
+
+def sanitize_latex_error_message(message: str) -> str:
+    """
+    Extract meaningful LaTeX error messages from pdflatex output.
+    Removes system paths and internal log details.
+    """
+    # Extract the most common errors
+    error_patterns = [
+        r"! LaTeX Error: (.*)",  # Capture LaTeX-specific errors
+        r"! Undefined control sequence\.\s*(.*)",  # Undefined commands
+        r"! Missing number, treated as zero\.",  # Missing number
+        r"! Missing \\\\[A-Za-z]+",  # Missing \begin, \end, etc.
+        r"! Extra \\\\[A-Za-z]+",  # Extra \end or similar
+        r"l\.(\d+) (.*)",  # Line number errors
+    ]
+
+    extracted_errors = []
+    for pattern in error_patterns:
+        matches = re.findall(pattern, message)
+        for match in matches:
+            if isinstance(match, tuple):
+                extracted_errors.append(f"Line {match[0]}: {match[1]}")
+            else:
+                extracted_errors.append(match)
+
+    # Limit to first 5 unique errors to avoid information overload
+    extracted_errors = list(dict.fromkeys(extracted_errors))[:5]
+    return "\n".join(extracted_errors) if extracted_errors else "Unknown LaTeX error."
+
+
+def extract_latex_error(log_text: str) -> str:
+    """Best error summary from a TeX log, falling back to the first '!' line."""
+    message = sanitize_latex_error_message(log_text)
+    if message == "Unknown LaTeX error." and '!' in log_text:
+        return log_text.split('!')[1].split('\n')[0].strip()
+    return message
+
+
+@dataclass(frozen=True)
+class TexBackend:
+    """A TeX engine binary and how to drive it."""
+    name: str
+    binary: str
+    kpse_engine: str
+    supports_formats: bool = False
+
+    def available(self) -> bool:
+        return shutil.which(self.binary) is not None
+
+    def command(
+        self,
+        tex_file: str,
+        jobname: Optional[str] = None,
+        fmt: Optional[str] = None,
+        output_directory: Optional[str] = None,
+    ) -> List[str]:
+        command = [self.binary, '-interaction=nonstopmode', '-halt-on-error']
+        if output_directory:
+            command += ['-output-directory', output_directory]
+        if fmt:
+            command.append(f'-fmt={fmt}')
+        if jobname:
+            command.append(f'-jobname={jobname}')
+        command.append(tex_file)
+        return command
+
+    @property
+    def profile(self) -> Tuple[str, ...]:
+        """Everything besides the source that determines the output PDF."""
+        return (self.name, '-interaction=nonstopmode', '-halt-on-error', 'passes=auto')
+
+
+BACKENDS: Dict[str, TexBackend] = {}
+
+
+def register_backend(backend: TexBackend) -> None:
+    BACKENDS[backend.name] = backend
+
+
+register_backend(TexBackend('pdflatex', 'pdflatex', 'pdftex', supports_formats=True))
+register_backend(TexBackend('lualatex', 'lualatex', 'luatex'))
+register_backend(TexBackend('xelatex', 'xelatex', 'xetex'))
+
+
+def available_backends() -> List[TexBackend]:
+    return [backend for backend in BACKENDS.values() if backend.available()]
+
+
+class EngineSelector:
+    """
+    Remembers, per template (hash of the preamble), the fastest backend that
+    compiled it successfully. Choices persist in a JSON file shared by all
+    worker processes, holding at most ``max_entries`` templates. A forced
+    backend name disables selection.
+    """
+
+    def __init__(
+        self, path: str, default: str = 'pdflatex', forced: Optional[str] = None,
+        max_entries: int = MAX_ENGINE_SELECTIONS
+    ):
+        self.path = path
+        self.default = default
+        self.forced = forced
+        self.max_entries = max_entries
+        self._choices: Optional[Dict[str, dict]] = None
+        self._pending: Set[str] = set()
+        # Templates no backend compiled; not retried by this process
+        self._failed: Set[str] = set()
+
+    @staticmethod
+    def template_hash(source: str) -> Optional[str]:
+        parts = split_preamble(source)
+        return preamble_hash(parts[0]) if parts else None
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def choose(self, source: str) -> str:
+        if self.forced:
+            return self.forced
+        if self._choices is None:
+            self._choices = self._load()
+        digest = self.template_hash(source)
+        choice = self._choices.get(digest, {}).get('backend') if digest else None
+        return choice if choice in BACKENDS else self.default
+
+    def claim_benchmark(self, source: str) -> Optional[str]:
+        """Return the template hash if it still needs benchmarking, marking it in progress."""
+        if self.forced:
+            return None
+        if self._choices is None:
+            self._choices = self._load()
+        digest = self.template_hash(source)
+        if digest is None or digest in self._choices or digest in self._pending or digest in self._failed:
+            return None
+        self._pending.add(digest)
+        return digest
+
+    def release(self, digest: str) -> None:
+        self._pending.discard(digest)
+
+    def record(self, digest: str, timings: Dict[str, Optional[float]]) -> Optional[str]:
+        """Store benchmark timings (None = failed) and return the winning backend, if any."""
+        self._pending.discard(digest)
+        succeeded = {name: seconds for name, seconds in timings.items() if seconds is not None}
+        if not succeeded:
+            # Nothing to choose; the default backend keeps serving it
+            self._failed.add(digest)
+            return None
+        winner = min(succeeded, key=succeeded.get)
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        # Serialize the read-modify-write with other workers, so none of their choices is lost
+        with open(f"{self.path}.lock", 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            choices = self._load()
+            choices.pop(digest, None)
+            choices[digest] = {'backend': winner, 'timings': timings}
+            # Insertion order is recording order: drop the oldest beyond the cap
+            for stale in list(choices)[:max(0, len(choices) - self.max_entries)]:
+                del choices[stale]
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(choices, f, indent=2)
+            os.replace(tmp_path, self.path)
+        self._choices = choices
+        return winner
+
+    def stats(self) -> Dict[str, object]:
+        if self._choices is None:
+            self._choices = self._load()
+        return {
+            'forced': self.forced,
+            'templates': len(self._choices),
+            'choices': dict(Counter(str(choice['backend']) for choice in self._choices.values())),
+        }
+
+
+class LatexEngine:
+    """
+    Single entry point for turning LaTeX source into a PDF.
+
+    Picks a backend per template, checks the PDF cache, then runs the
+    compile on the shared pool inside a reusable sandbox: precompiled
+    preamble format when available, as many passes as the document needs,
+    and the result copied into the cache.
+    """
+
+    def __init__(
+        self,
+        pool: CompilePool,
+        sandboxes: SandboxPool,
+        pdf_cache: PdfCache,
+        format_cache: FormatCache,
+        selector: EngineSelector,
+    ):
+        self.pool = pool
+        self.sandboxes = sandboxes
+        self.pdf_cache = pdf_cache
+        self.format_cache = format_cache
+        self.selector = selector
+        self._background: Set[asyncio.Task] = set()
+
+    def backend_for(self, content: str) -> TexBackend:
+        return BACKENDS[self.selector.choose(content)]
+
+    def cache_key(self, content: str, backend: TexBackend) -> str:
+        return self.pdf_cache.key(content, backend.profile)
+
+    async def compile(self, content: str) -> bytes:
+        """Compile to PDF bytes (served from the cache's memory tier when hot)."""
+        backend = self.backend_for(content)
+        cached = self.pdf_cache.get(self.cache_key(content, backend))
+        if cached is not None:
+            return cached
+        with await self.open_pdf(content, backend) as f:
+            return f.read()
+
+    async def open_pdf(self, content: str, backend: Optional[TexBackend] = None) -> BinaryIO:
+        """
+        Compile and open the cached PDF. The open file stays readable even if
+        the cache evicts the entry while it is being served.
+        """
+        backend = backend or self.backend_for(content)
+        for attempt in range(2):
+            path = await self.compile_to_path(content, backend)
+            try:
+                return open(path, 'rb')
+            except FileNotFoundError:
+                # Evicted between the compile and the open; a second compile re-stores it
+                if attempt:
+                    raise
+
+    async def compile_to_path(self, content: str, backend: Optional[TexBackend] = None) -> str:
+        """Compile and return the path of the cached PDF."""
+        backend = backend or self.backend_for(content)
+        cache_key = self.cache_key(content, backend)
+        # Cache hits never take a worker or a queue slot
+        cached_path = self.pdf_cache.get_path(cache_key)
+        if cached_path:
+            return cached_path
+
+        self._maybe_benchmark(content)
+        started = time.monotonic()
+        pdf_path = await self.pool.submit(lambda: self._compile(content, backend, cache_key))
+        self.pdf_cache.record_compile(time.monotonic() - started)
+        return pdf_path
+
+    async def _compile(self, content: str, backend: TexBackend, cache_key: str) -> str:
+        # Borrow a scratch directory; it is emptied completely on release
+        with self.sandboxes.sandbox() as work_dir:
+            pdf_path = await self.run(content, backend, work_dir)
+            # Copy into the cache (in-kernel on Linux) before the sandbox is reset
+            return self.pdf_cache.put_file(cache_key, pdf_path)
+
+    async def run(
+        self, content: str, backend: TexBackend, work_dir: str, search_path: Optional[str] = None
+    ) -> str:
+        """
+        Compile ``content`` inside ``work_dir`` and return the PDF path there.
+        Files it includes are also looked up in ``search_path``, if given.
+        """
+        env = None
+        prepared = None
+        if backend.supports_formats and backend.name == self.format_cache.engine:
+            # Documents sharing a bundled template's preamble load its
+            # precompiled format instead of re-reading every package
+            prepared = await self.format_cache.prepare(content)
+
+        if prepared:
+            tex_path = os.path.join(work_dir, "temp.body.tex")
+            command = backend.command(tex_path, jobname="temp", fmt=prepared.format_name)
+            env = self.format_cache.env()
+        else:
+            tex_path = os.path.join(work_dir, "temp.tex")
+            command = backend.command(tex_path, jobname="temp")
+        with open(tex_path, 'w') as f:
+            f.write(prepared.source if prepared else content)
+        if search_path:
+            # Searched before the defaults, which the trailing separator keeps
+            base = env or os.environ
+            env = {**base, "TEXINPUTS": f"{search_path}{os.pathsep}{base.get('TEXINPUTS', '')}"}
+
+        pdf_path = os.path.join(work_dir, "temp.pdf")
+        log_path = os.path.join(work_dir, "temp.log")
+        aux_path = os.path.join(work_dir, "temp.aux")
+
+        # Rerun only while the log or .aux says references are still unresolved
+        passes = 0
+        while True:
+            aux_before = read_aux(aux_path)
+            process = await run_process(command, cwd=work_dir, env=env)
+            passes += 1
+            if process.returncode != 0 or passes >= MAX_LATEX_PASSES:
+                break
+            if not needs_rerun(process.stdout, aux_before, read_aux(aux_path)):
+                break
+
+        if process.returncode != 0:
+            log_text = process.stdout
+            if os.path.exists(log_path):
+                with open(log_path, 'r', errors='replace') as f:
+                    log_text = f.read()
+            raise LatexCompileError(extract_latex_error(log_text))
+
+        if not os.path.exists(pdf_path):
+            raise LatexCompileError("PDF file was not generated")
+
+        compile_passes[passes] += 1
+        return pdf_path
+
+    def run_sync(
+        self, content: str, backend: TexBackend, work_dir: str,
+        search_path: Optional[str] = None, timeout: Optional[float] = None
+    ) -> str:
+        """
+        Blocking ``run`` for scripts and tooling, queued on the compile pool
+        like every other compile. From async code, call it in a worker thread.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("run_sync would block the event loop; call it from a worker thread")
+
+        def job():
+            return self.run(content, backend, work_dir, search_path)
+
+        loop = self.pool.loop
+        if loop is not None and loop.is_running():
+            # The app's pool, running on its loop in another thread
+            return asyncio.run_coroutine_threadsafe(self.pool.submit(job, timeout), loop).result()
+
+        async def alone():
+            # No app running: the pool lives for this one compile
+            try:
+                return await self.pool.submit(job, timeout)
+            finally:
+                await self.pool.shutdown()
+        return asyncio.run(alone())
+
+    def _maybe_benchmark(self, content: str) -> None:
+        # Only bundled templates: benchmarking every user-edited preamble
+        # would tie up the shared pool for documents seen once
+        if self.format_cache is None or not self.format_cache.is_registered(content):
+            return
+        digest = self.selector.claim_benchmark(content)
+        if digest is None:
+            return
+        task = asyncio.ensure_future(self._benchmark(content, digest))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _benchmark(self, content: str, digest: str) -> None:
+        """Time every installed backend on this template once and remember the fastest."""
+        timings: Dict[str, Optional[float]] = {}
+        try:
+            for backend in available_backends():
+                async def timed(backend=backend):
+                    if backend.supports_formats:
+                        # Time compiles, not the one-off format build
+                        await self.format_cache.prepare(content)
+                    with self.sandboxes.sandbox() as work_dir:
+                        started = time.monotonic()
+                        await self.run(content, backend, work_dir)
+                        return time.monotonic() - started
+                try:
+                    timings[backend.name] = await self.pool.submit(timed)
+                except CompileQueueFull:
+                    # Too busy to benchmark now; try again on a later compile
+                    self.selector.release(digest)
+                    return
+                except Exception:
+                    timings[backend.name] = None
+        except asyncio.CancelledError:
+            self.selector.release(digest)
+            raise
+
+        winner = self.selector.record(digest, timings)
+        if winner is None:
+            logger.warning(f"No backend compiled template {digest}: {timings}")
+        else:
+            logger.info(f"Engine benchmark for template {digest}: {timings}, using {winner}")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'backends': [backend.name for backend in available_backends()],
+            'selection': self.selector.stats(),
+            'passes': dict(compile_passes),
+        }
+
+    async def shutdown(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
@@ -0,0 +1,227 @@
+# app/services/latex_formats.py
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from app.services.compile_pool import run_process
+from app.services.pdf_cache import normalize_latex_source
+
+logger = logging.getLogger(__name__)
+
+# First uncommented \begin{document}
+PREAMBLE_END = re.compile(r"^[^%\n]*?(\\begin\{document\})", re.MULTILINE)
+
+# pdfTeX keeps glyph-to-unicode tables outside the dumped format, so these
+# preamble lines are replayed on every compile that loads the format
+UNDUMPABLE_LINES = re.compile(r"^[^%\n]*(glyphtounicode|\\pdfgentounicode)[^\n]*$", re.MULTILINE)
+
+
+def split_preamble(source: str) -> Optional[Tuple[str, str]]:
+    """Split a document into (preamble, body), the body starting at \\begin{document}."""
+    match = PREAMBLE_END.search(source)
+    if not match:
+        return None
+    start = match.start(1)
+    return source[:start], source[start:]
+
+
+def preamble_hash(preamble: str) -> str:
+    return hashlib.sha256(normalize_latex_source(preamble).encode()).hexdigest()[:16]
+
+
+@dataclass
+class PreparedSource:
+    """A document rewritten to run against a precompiled format."""
+    format_name: str
+    source: str
+
+
+class FormatCache:
+    """
+    Dumped pdflatex formats (.fmt) for known preambles.
+
+    Preambles are registered up front (the bundled templates); a format is
+    built for each one at startup or on first use. Documents whose preamble
+    matches a built format are compiled from their body alone with
+    ``-fmt=<name>``, skipping package loading. Format names embed a stamp of
+    the TeX installation, so upgrading TeX rebuilds them automatically.
+    """
+
+    def __init__(self, directory: str, engine: str = "pdflatex"):
+        self.directory = directory
+        self.engine = engine
+        self._known: Dict[str, str] = {}
+        self._failed: Set[str] = set()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._stamp: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.build_failures = 0
+
+    def register(self, source: str) -> Optional[str]:
+        """Remember the preamble of ``source``; returns its hash."""
+        parts = split_preamble(source)
+        if parts is None:
+            return None
+        digest = preamble_hash(parts[0])
+        self._known[digest] = parts[0]
+        return digest
+
+    def is_registered(self, source: str) -> bool:
+        """Whether ``source`` uses the preamble of a registered template."""
+        parts = split_preamble(source)
+        return parts is not None and preamble_hash(parts[0]) in self._known
+
+    def register_directory(self, directory: Path) -> int:
+        for tex_file in sorted(directory.glob('*.tex')):
+            with open(tex_file, 'r') as f:
+                self.register(f.read())
+        return len(self._known)
+
+    async def tex_stamp(self) -> Optional[str]:
+        """Fingerprint of the engine binary and its base format; None if TeX is missing."""
+        if self._stamp is None:
+            self._stamp = await self._read_stamp()
+        return self._stamp or None
+
+    async def _read_stamp(self) -> str:
+        try:
+            version = (await asyncio.wait_for(run_process([self.engine, '--version']), 10)).stdout
+            base_format = (await asyncio.wait_for(
+                run_process(['kpsewhich', f'-engine={self._tex_engine()}', f'{self.engine}.fmt']), 10
+            )).stdout.strip()
+        except (OSError, asyncio.TimeoutError):
+            return ""
+
+        fingerprint = [version, base_format]
+        if base_format and os.path.isfile(base_format):
+            stat = os.stat(base_format)
+            fingerprint += [str(stat.st_size), str(stat.st_mtime_ns)]
+        return hashlib.sha256("\0".join(fingerprint).encode()).hexdigest()[:12]
+
+    def _tex_engine(self) -> str:
+        return {"pdflatex": "pdftex", "lualatex": "luatex", "xelatex": "xetex"}.get(self.engine, self.engine)
+
+    def _format_name(self, digest: str) -> Optional[str]:
+        # Unknown until tex_stamp has run (prepare, build and warm await it)
+        if not self._stamp:
+            return None
+        return f"{self.engine}-{digest}-{self._stamp}"
+
+    def _format_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.fmt")
+
+    def env(self) -> Dict[str, str]:
+        """Process environment that lets kpathsea find our formats (trailing separator keeps the defaults)."""
+        return {**os.environ, "TEXFORMATS": f"{self.directory}{os.pathsep}"}
+
+    def lookup(self, source: str) -> Optional[PreparedSource]:
+        """Return the body-only rewrite of ``source`` if its format is already built."""
+        parts = split_preamble(source)
+        if parts is None:
+            return None
+        preamble, body = parts
+        digest = preamble_hash(preamble)
+        if digest not in self._known:
+            return None
+        name = self._format_name(digest)
+        if name is None or not os.path.isfile(self._format_path(name)):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        replay = "\n".join(m.group(0) for m in UNDUMPABLE_LINES.finditer(preamble))
+        return PreparedSource(format_name=name, source=f"{replay}\n{body}")
+
+    async def prepare(self, source: str) -> Optional[PreparedSource]:
+        """Like `lookup`, but builds the format first if the preamble is known."""
+        parts = split_preamble(source)
+        if parts is None:
+            return None
+        digest = preamble_hash(parts[0])
+        await self.tex_stamp()
+        if digest in self._known and digest not in self._failed:
+            await self.build(digest)
+        return self.lookup(source)
+
+    async def build(self, digest: str) -> bool:
+        """Build the format for a registered preamble unless it already exists."""
+        await self.tex_stamp()
+        name = self._format_name(digest)
+        if name is None or digest in self._failed:
+            return False
+
+        lock = self._locks.setdefault(digest, asyncio.Lock())
+        async with lock:
+            target = self._format_path(name)
+            if os.path.isfile(target):
+                return True
+
+            os.makedirs(self.directory, exist_ok=True)
+            build_dir = tempfile.mkdtemp(dir=self.directory)
+            try:
+                with open(os.path.join(build_dir, "preamble.tex"), 'w') as f:
+                    f.write(self._known[digest])
+                    f.write("\n\\dump\n")
+
+                process = await run_process(
+                    [
+                        self.engine,
+                        '-ini',
+                        '-interaction=nonstopmode',
+                        '-halt-on-error',
+                        f'-jobname={name}',
+                        f'&{self.engine}',
+                        'preamble.tex'
+                    ],
+                    cwd=build_dir
+                )
+                built = os.path.join(build_dir, f"{name}.fmt")
+                if process.returncode != 0 or not os.path.isfile(built):
+                    self._failed.add(digest)
+                    self.build_failures += 1
+                    logger.warning(f"Could not build format for preamble {digest}")
+                    return False
+
+                # Atomic rename so concurrent workers never load a partial format
+                os.replace(built, target)
+                self.builds += 1
+                logger.info(f"Built LaTeX format {name}")
+                return True
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+    async def warm(self) -> None:
+        """Build every registered format and drop formats from older TeX installations."""
+        stamp = await self.tex_stamp()
+        if stamp is None:
+            logger.info(f"{self.engine} not available, skipping format precompilation")
+            return
+
+        if os.path.isdir(self.directory):
+            for entry in os.listdir(self.directory):
+                if entry.endswith(".fmt") and not entry.endswith(f"-{stamp}.fmt"):
+                    os.remove(os.path.join(self.directory, entry))
+
+        for digest in list(self._known):
+            try:
+                await self.build(digest)
+            except Exception as e:
+                logger.error(f"Error building format {digest}: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "known_preambles": len(self._known),
+            "hits": self.hits,
+            "misses": self.misses,
+            "builds": self.builds,
+            "build_failures": self.build_failures,
+        }
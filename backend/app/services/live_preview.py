@@ -0,0 +1,123 @@
+# app/services/live_preview.py
+import asyncio
+import json
+import logging
+from collections import Counter
+from typing import Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Totals across every open channel in this process
+preview_stats = Counter()
+
+
+def parse_preview_message(text: Optional[str], latest_revision: int) -> Tuple[int, str]:
+    """
+    Validate a client frame, {"revision": n, "content": "..."} with revision
+    optional, and return (revision, content). Raises ValueError with a
+    message fit to send back to the client.
+    """
+    if text is None:
+        raise ValueError("Messages must be JSON text frames")
+    try:
+        message = json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError("Message is not valid JSON")
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    content = message.get("content")
+    if not isinstance(content, str):
+        raise ValueError("Message must include LaTeX 'content'")
+    revision = message.get("revision", latest_revision + 1)
+    if isinstance(revision, bool) or not isinstance(revision, int):
+        raise ValueError("'revision' must be an integer")
+    return revision, content
+
+
+class PreviewChannel:
+    """
+    Live-preview state for one editor connection.
+
+    Only the newest submitted revision matters: bursts of edits are
+    debounced, a compile still running when a newer revision arrives is
+    cancelled (which kills its pdflatex process), and results for anything
+    but the latest revision are dropped instead of sent.
+    """
+
+    def __init__(
+        self,
+        compile: Callable[[str], Awaitable[bytes]],
+        send_pdf: Callable[[int, bytes], Awaitable[None]],
+        send_error: Callable[[int, str], Awaitable[None]],
+        debounce: float = 0.2,
+    ):
+        self._compile = compile
+        self._send_pdf = send_pdf
+        self._send_error = send_error
+        self.debounce = debounce
+        self._latest: Optional[Tuple[int, str]] = None
+        self._finished_revision = -1
+        self._running_revision: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def latest_revision(self) -> int:
+        return self._latest[0] if self._latest else -1
+
+    def submit(self, revision: int, content: str) -> None:
+        """Record a new revision and supersede any older compile in flight."""
+        if revision <= self.latest_revision:
+            return
+        self._latest = (revision, content)
+        preview_stats["received"] += 1
+        if self._task is not None and self._running_revision is not None:
+            self._task.cancel()
+            preview_stats["superseded"] += 1
+        self._wakeup.set()
+
+    async def _debounce(self) -> None:
+        """Wait until no new revision has arrived for `debounce` seconds."""
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.debounce)
+            except asyncio.TimeoutError:
+                return
+
+    async def run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            await self._debounce()
+
+            revision, content = self._latest
+            if revision <= self._finished_revision:
+                continue
+
+            self._running_revision = revision
+            self._task = asyncio.ensure_future(self._compile(content))
+            try:
+                await asyncio.wait({self._task})
+            except asyncio.CancelledError:
+                self._task.cancel()
+                raise
+            finally:
+                task, self._task, self._running_revision = self._task, None, None
+
+            if task.cancelled() or revision != self.latest_revision:
+                continue
+
+            self._finished_revision = revision
+            error = task.exception()
+            if error is None:
+                preview_stats["compiled"] += 1
+                await self._send_pdf(revision, task.result())
+            else:
+                preview_stats["failed"] += 1
+                await self._send_error(revision, str(getattr(error, "detail", error)))
+
+    async def close(self) -> None:
+        """Cancel the compile in flight, if any."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.wait({self._task})
@@ -0,0 +1,214 @@
+# app/services/llm_client.py
+import asyncio
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limits and transient server-side failures
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when the provider rejects a request or returns something unusable."""
+
+
+class LLMUnavailable(LLMError):
+    """Raised when the circuit is open or every retry failed; worth trying again later."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast after ``failure_threshold`` consecutive failures. After
+    ``reset_seconds`` a single trial call is let through: success closes the
+    circuit again, failure keeps it open for another period. A trial that
+    never reports back (e.g. cancelled) is replaced after another period.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.retry_after() == 0 else "open"
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.retry_after() > 0:
+            return False
+        now = time.monotonic()
+        if self._trial_started is not None and now - self._trial_started < self.reset_seconds:
+            return False
+        self._trial_started = now
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_started is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"LLM circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+        self._trial_started = None
+
+
+class LLMClient:
+    """
+    Async client for an OpenAI-compatible chat completions API (OpenAI, or
+    Groq's /openai/v1). Connections are pooled and kept alive, at most
+    ``max_concurrency`` calls are in flight, transient failures are retried
+    with full-jitter backoff, and a circuit breaker stops hammering a
+    provider that keeps failing.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.transport = transport
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self._call_seconds = 0.0
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        # Built on first use, inside the running event loop
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency
+                ),
+                transport=self.transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full jitter: uniform in [0, base * 2^attempt], but never sooner than the server asked."""
+        delay = random.uniform(0, self.backoff_seconds * 2 ** attempt)
+        return max(delay, retry_after or 0.0)
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        timeout: Optional[float] = None,
+        **options: Any,
+    ) -> str:
+        """Content of the first choice of a chat completion."""
+        import httpx
+
+        client = self._get_client()
+        payload = {"model": model, "messages": messages, **options}
+        async with self._semaphore:
+            last_error = "no attempt made"
+            for attempt in range(self.max_retries + 1):
+                if not self.breaker.allow():
+                    self.rejected += 1
+                    raise LLMUnavailable("LLM provider circuit is open", self.breaker.retry_after())
+
+                retry_after = None
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/chat/completions", json=payload,
+                        timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+                    )
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    last_error = f"{type(e).__name__}: {e}"
+                else:
+                    self.calls += 1
+                    self._call_seconds += time.perf_counter() - started
+                    if response.status_code < 400:
+                        self.breaker.record_success()
+                        try:
+                            return response.json()["choices"][0]["message"]["content"]
+                        except (ValueError, KeyError, IndexError, TypeError):
+                            raise LLMError(f"Unexpected LLM response: {response.text[:200]}")
+                    if response.status_code not in RETRYABLE_STATUSES:
+                        # Our request is at fault; the provider itself is fine
+                        self.breaker.record_success()
+                        raise LLMError(f"LLM provider returned {response.status_code}: {response.text[:200]}")
+                    last_error = f"HTTP {response.status_code}"
+                    try:
+                        retry_after = float(response.headers.get("Retry-After", ""))
+                    except ValueError:
+                        pass
+
+                self.breaker.record_failure()
+                if retry_after and retry_after > self.timeout:
+                    # Not worth holding the request open that long
+                    self.failures += 1
+                    raise LLMUnavailable(f"LLM provider asked to retry in {retry_after:.0f}s", retry_after)
+                if attempt < self.max_retries:
+                    self.retries += 1
+                    delay = self.backoff(attempt, retry_after)
+                    logger.info(f"LLM call failed ({last_error}); retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+
+            self.failures += 1
+            raise LLMUnavailable(f"LLM provider failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected_by_breaker": self.rejected,
+            "breaker": self.breaker.state,
+            "average_call_seconds": round(self._call_seconds / self.calls, 3) if self.calls else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
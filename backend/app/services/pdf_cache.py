@@ -0,0 +1,217 @@
+# app/services/pdf_cache.py
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_latex_source(source: str) -> str:
+    """
+    Normalize LaTeX source so that edits which cannot change the output
+    (line endings, trailing whitespace, leading/trailing blank lines) map
+    to the same cache key.
+    """
+    lines = source.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+class PdfCache:
+    """
+    Content-addressed PDF store.
+
+    Entries live on local disk under ``<directory>/<key[:2]>/<key>.pdf`` with a
+    total size cap and least-recently-used eviction (recency is tracked via
+    file mtime so it survives restarts and is shared between worker
+    processes). A small in-memory LRU keeps the hottest PDFs as bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, memory_items: int = 64):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._compile_seconds = 0.0
+        self._compiles = 0
+
+    @staticmethod
+    def key(source: str, compiler: Sequence[str]) -> str:
+        """Hash of the normalized source plus everything that affects compiler output."""
+        digest = hashlib.sha256()
+        digest.update("\0".join(compiler).encode())
+        digest.update(b"\0\0")
+        digest.update(normalize_latex_source(source).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF bytes, or None on a miss."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+
+        path = self.get_path(key, count=False)
+        if path is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            # Evicted by another worker between the stat and the read
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, data)
+        return data
+
+    def get_path(self, key: str, count: bool = True) -> Optional[str]:
+        """Return the on-disk path of a cached PDF, or None on a miss."""
+        path = self._path(key)
+        try:
+            # Refresh recency for LRU eviction
+            os.utime(path)
+        except OSError:
+            if count:
+                with self._lock:
+                    self.misses += 1
+            return None
+        if count:
+            with self._lock:
+                self.disk_hits += 1
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        """Store PDF bytes and return the path of the cached copy."""
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+
+        path = self._write(key, write)
+        with self._lock:
+            self._remember(key, data)
+        return path
+
+    def put_file(self, key: str, source_path: str) -> str:
+        """Store the PDF at ``source_path`` and return the path of the cached copy."""
+        # copyfile copies in the kernel (sendfile) on Linux
+        return self._write(key, lambda tmp_path: shutil.copyfile(source_path, tmp_path))
+
+    def _write(self, key: str, writer) -> str:
+        """Store a PDF written to a temp path by ``writer``; returns the cached path."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see partial PDFs
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self.stores += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            over_budget = self._disk_bytes is None or self._disk_bytes > self.max_bytes
+        if over_budget:
+            self._evict()
+        return path
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _scan(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used files until the disk tier fits its budget."""
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+            key = os.path.basename(path)[:-len(".pdf")]
+            with self._lock:
+                self._memory.pop(key, None)
+
+        with self._lock:
+            self._disk_bytes = total
+            self.evictions += evicted
+        if evicted:
+            logger.info(f"Evicted {evicted} PDFs from cache, {total} bytes remain")
+
+    def record_compile(self, seconds: float) -> None:
+        """Report how long a cache miss took to compile, to estimate savings."""
+        with self._lock:
+            self._compiles += 1
+            self._compile_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            average_compile = (
+                self._compile_seconds / self._compiles if self._compiles else 0.0
+            )
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes,
+                "estimated_compile_seconds_saved": round(hits * average_compile, 2),
+            }
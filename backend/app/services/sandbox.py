@@ -0,0 +1,89 @@
+# app/services/sandbox.py
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def default_sandbox_root() -> str:
+    """Prefer tmpfs so compile scratch files never touch the disk."""
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+class SandboxPool:
+    """
+    Pre-created scratch directories reused across compile jobs.
+
+    A sandbox is emptied completely (whatever files pdflatex and its
+    packages left behind) before it goes back to the pool. If every sandbox
+    is busy a temporary extra one is created and removed on release.
+    """
+
+    def __init__(self, size: int, root: Optional[str] = None):
+        self.size = max(1, size)
+        self.root = root or default_sandbox_root()
+        self._base: Optional[str] = None
+        self._free: List[str] = []
+        self._lock = threading.Lock()
+        self.overflows = 0
+
+    def _ensure_created(self) -> None:
+        if self._base is not None:
+            return
+        self._base = tempfile.mkdtemp(prefix="resarch-sandboxes-", dir=self.root)
+        for index in range(self.size):
+            path = os.path.join(self._base, str(index))
+            os.mkdir(path)
+            self._free.append(path)
+        logger.info(f"Created {self.size} compile sandboxes under {self._base}")
+
+    def acquire(self) -> str:
+        with self._lock:
+            self._ensure_created()
+            if self._free:
+                return self._free.pop()
+            self.overflows += 1
+        return tempfile.mkdtemp(prefix="overflow-", dir=self._base)
+
+    def release(self, path: str) -> None:
+        if os.path.basename(path).startswith("overflow-"):
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        self.reset(path)
+        with self._lock:
+            self._free.append(path)
+
+    @staticmethod
+    def reset(path: str) -> None:
+        """Remove everything inside ``path`` but keep the directory itself."""
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+    @contextmanager
+    def sandbox(self) -> Iterator[str]:
+        path = self.acquire()
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._base is not None:
+                shutil.rmtree(self._base, ignore_errors=True)
+            self._base = None
+            self._free = []
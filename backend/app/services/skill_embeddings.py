@@ -0,0 +1,269 @@
+# app/services/skill_embeddings.py
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Name of the file pointing at the live build; swapped atomically on rebuild
+CURRENT_FILE = "CURRENT"
+# Held by the worker writing a build, so the others don't embed the catalog too
+LOCK_FILE = "build.lock"
+KMEANS_ITERATIONS = 10
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length in place; all-zero rows (no known words) stay zero."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def train_ivf(vectors: np.ndarray, lists: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0):
+    """Spherical k-means over unit rows: (centroids, list of each row)."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = (vectors @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        # Lists that lost every member keep their old centroid
+        filled = sums.any(axis=1)
+        centroids[filled] = normalize_rows(sums[filled])
+    return centroids, (vectors @ centroids.T).argmax(axis=1)
+
+
+def embed_with_spacy(names: List[str]) -> np.ndarray:
+    """Mean word vector of each name from the spaCy model."""
+    from app.core.skill_categorization import get_nlp
+
+    return np.array([doc.vector for doc in get_nlp().pipe(names)], dtype=np.float32)
+
+
+@dataclass
+class _Build:
+    name: str
+    vectors: np.ndarray
+    ids: List[str]
+    rows: Dict[str, int] = field(default_factory=dict)
+    # IVF lists: rows offsets[i]:offsets[i + 1] belong to centroids[i]
+    offsets: Optional[List[int]] = None
+    centroids: Optional[np.ndarray] = None
+
+
+class SkillEmbeddingIndex:
+    """
+    Unit-length float32 embeddings of every skill, one row per skill, kept
+    in a .npy file that is opened with mmap: every worker on a host reads
+    the same pages from the OS page cache rather than holding its own copy.
+
+    Top-k queries are exact cosine scans done as one matrix-vector product.
+    Catalogs of at least ``ivf_min_skills`` are partitioned into IVF lists
+    at build time, and queries then scan only the ``nprobe`` closest lists.
+
+    A new build reuses the rows of the current one and embeds only the
+    skills it lacks; one worker per host builds at a time.
+    """
+
+    def __init__(
+        self, directory: str, ivf_min_skills: int = 50_000, nprobe: int = 8, refresh_seconds: float = 60
+    ):
+        self.directory = directory
+        self.ivf_min_skills = ivf_min_skills
+        self.nprobe = nprobe
+        self.refresh_seconds = refresh_seconds
+        self._build: Optional[_Build] = None
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        build = self._build
+        return len(build.ids) if build else 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._build is not None
+
+    def stale(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at > self.refresh_seconds
+
+    def mark_checked(self) -> None:
+        self._checked_at = time.monotonic()
+
+    @contextmanager
+    def _build_lock(self, wait: bool = True) -> Iterator[bool]:
+        """Hold the host-wide build lock; yields False if ``wait`` is off and another worker has it."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILE), "w") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _current_name(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self) -> bool:
+        """Map the latest build if it is not the one already mapped. Returns whether one is loaded."""
+        name = self._current_name()
+        if name is None:
+            return self.loaded
+        if self._build is not None and self._build.name == name:
+            return True
+
+        path = os.path.join(self.directory, name)
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+            vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+            centroids = np.load(os.path.join(path, "centroids.npy")) if meta["offsets"] else None
+        except FileNotFoundError:
+            # Another worker replaced the build while we were reading it
+            return self.loaded
+
+        ids = meta["ids"]
+        self._build = _Build(
+            name=name, vectors=vectors, ids=ids, rows={skill_id: row for row, skill_id in enumerate(ids)},
+            offsets=meta["offsets"], centroids=centroids
+        )
+        logger.info(f"Mapped {len(ids)} skill embeddings from {path}")
+        return True
+
+    def build(
+        self, skills: Sequence[Tuple[Any, str]], embed: Callable[[List[str]], np.ndarray], wait: bool = True
+    ) -> bool:
+        """
+        Make a build of the ``(id, name)`` pairs current, embedding only the
+        skills the current build lacks. Returns False without building if
+        ``wait`` is off and another worker is building.
+        """
+        with self._lock, self._build_lock(wait) as locked:
+            if not locked:
+                return False
+            # Another worker may have finished a build while we waited
+            self.load()
+            previous = self._build
+            ids = [str(skill_id) for skill_id, _ in skills]
+            if previous is not None and set(ids) == set(previous.ids):
+                return True
+
+            known = [previous.rows.get(skill_id) for skill_id in ids] if previous else [None] * len(ids)
+            missing = [row for row, previous_row in enumerate(known) if previous_row is None]
+            embedded = None
+            if missing:
+                embedded = normalize_rows(np.asarray(embed([skills[row][1] for row in missing]), dtype=np.float32))
+            dimensions = previous.vectors.shape[1] if previous is not None else embedded.shape[1]
+            vectors = np.zeros((len(ids), dimensions), dtype=np.float32)
+            reused = [row for row, previous_row in enumerate(known) if previous_row is not None]
+            if reused:
+                vectors[reused] = previous.vectors[[known[row] for row in reused]]
+            if missing:
+                vectors[missing] = embedded
+
+            offsets = centroids = None
+            if len(ids) >= self.ivf_min_skills:
+                lists = int(np.sqrt(len(ids)))
+                if previous is not None and previous.centroids is not None and len(ids) < 2 * len(previous.ids):
+                    # Keep the trained lists; new skills join the list nearest to them
+                    centroids = previous.centroids
+                    assignment = np.empty(len(ids), dtype=np.int64)
+                    previous_lists = np.repeat(np.arange(len(centroids)), np.diff(previous.offsets))
+                    assignment[reused] = previous_lists[[known[row] for row in reused]]
+                    if missing:
+                        assignment[missing] = (embedded @ centroids.T).argmax(axis=1)
+                    lists = len(centroids)
+                else:
+                    centroids, assignment = train_ivf(vectors, lists)
+                # Store each list's rows contiguously so a probe is one slice
+                order = np.argsort(assignment, kind="stable")
+                vectors = vectors[order]
+                ids = [ids[row] for row in order]
+                offsets = np.searchsorted(assignment[order], np.arange(lists + 1)).tolist()
+
+            self._write(ids, vectors, offsets, centroids, embedded=len(missing))
+
+        self.load()
+        return True
+
+    def _write(
+        self, ids: List[str], vectors: np.ndarray, offsets: Optional[List[int]],
+        centroids: Optional[np.ndarray], embedded: int
+    ) -> None:
+        name = f"{time.time_ns()}-{os.getpid()}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), vectors)
+        if centroids is not None:
+            np.save(os.path.join(path, "centroids.npy"), centroids)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"ids": ids, "offsets": offsets}, f)
+
+        pointer = os.path.join(self.directory, f"{CURRENT_FILE}.{name}")
+        with open(pointer, "w") as f:
+            f.write(name)
+        os.replace(pointer, os.path.join(self.directory, CURRENT_FILE))
+        logger.info(
+            f"Built {len(ids)} skill embeddings in {path}, {embedded} newly embedded "
+            f"({len(offsets or [1]) - 1} IVF lists)"
+        )
+
+        # Builds are named by start time. Older ones can go: workers still
+        # mapping one keep reading it, as unlinked files stay mapped
+        for entry in os.listdir(self.directory):
+            if entry < name and os.path.isdir(os.path.join(self.directory, entry)):
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+
+    def top_k(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """The ``k`` skills most cosine-similar to ``query``, best first."""
+        build = self._build
+        if build is None or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return []
+        query = query / norm
+
+        if build.offsets is None:
+            rows = None
+            scores = build.vectors @ query
+        else:
+            probes = np.argsort(build.centroids @ query)[::-1][:self.nprobe]
+            slices = [(build.offsets[probe], build.offsets[probe + 1]) for probe in probes]
+            rows = np.concatenate([np.arange(start, end) for start, end in slices])
+            scores = np.concatenate([build.vectors[start:end] @ query for start, end in slices])
+
+        k = min(k, len(scores))
+        if not k:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top_rows = rows[top] if rows is not None else top
+        return [(build.ids[row], float(score)) for row, score in zip(top_rows, scores[top]) if score > 0]
+
+    def related(self, skill_id: Any, k: int = 10) -> List[Tuple[str, float]]:
+        """Skills closest to ``skill_id``, excluding itself."""
+        build = self._build
+        row = build.rows.get(str(skill_id)) if build else None
+        if row is None:
+            return []
+        neighbours = self.top_k(np.asarray(build.vectors[row]), k + 1)
+        return [(other, score) for other, score in neighbours if other != str(skill_id)][:k]
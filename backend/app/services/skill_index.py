@@ -0,0 +1,161 @@
+# app/services/skill_index.py
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from heapq import nsmallest
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Ranking tiers, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+# Sorts after any character a skill name can contain
+UPPER_BOUND = "\U0010ffff"
+
+
+def normalize_skill_name(name: str) -> str:
+    """Case- and whitespace-insensitive search key."""
+    return " ".join(name.lower().split())
+
+
+@dataclass(frozen=True)
+class IndexedSkill:
+    """The columns of a Skill row that search results need."""
+    id: Any
+    name: str
+    category: Any
+    source: Optional[str]
+
+    @classmethod
+    def from_row(cls, row) -> "IndexedSkill":
+        return cls(id=row.id, name=row.name, category=row.category, source=row.source)
+
+
+class SkillIndex:
+    """
+    In-process index of skill names for autocomplete.
+
+    Prefix lookups use a sorted list of normalized names and substring
+    lookups a suffix array over them, so a query costs two binary searches
+    plus the matches it returns. Results are ranked exact match, name
+    prefix, word prefix, then any substring; shorter names first within a
+    tier.
+
+    Writers in this process call ``add`` after they commit. Rows inserted by
+    other processes are picked up when ``stale`` says it is time to compare
+    the row count with the database again.
+    """
+
+    def __init__(self, refresh_seconds: float = 60):
+        self.refresh_seconds = refresh_seconds
+        self._skills: Dict[Any, IndexedSkill] = {}
+        self._keys: Dict[Any, str] = {}
+        self._names: List[Tuple[str, str]] = []
+        self._suffixes: List[Tuple[str, str, int]] = []
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    @property
+    def loaded(self) -> bool:
+        return self._checked_at is not None
+
+    def stale(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at > self.refresh_seconds
+
+    def mark_checked(self) -> None:
+        self._checked_at = time.monotonic()
+
+    def load(self, rows: Iterable) -> None:
+        """Replace the index contents with ``rows`` (Skill rows or IndexedSkill)."""
+        skills = {}
+        keys = {}
+        names = []
+        suffixes = []
+        for row in rows:
+            skill = row if isinstance(row, IndexedSkill) else IndexedSkill.from_row(row)
+            skill_id = str(skill.id)
+            key = normalize_skill_name(skill.name)
+            skills[skill_id] = skill
+            keys[skill_id] = key
+            names.append((key, skill_id))
+            suffixes.extend(self._suffixes_of(key, skill_id))
+        names.sort()
+        suffixes.sort()
+        with self._lock:
+            self._skills, self._keys = skills, keys
+            self._names, self._suffixes = names, suffixes
+        self.mark_checked()
+
+    def add(self, row) -> None:
+        """Index a newly committed skill (or refresh one whose name changed)."""
+        skill = row if isinstance(row, IndexedSkill) else IndexedSkill.from_row(row)
+        skill_id = str(skill.id)
+        key = normalize_skill_name(skill.name)
+        with self._lock:
+            old_key = self._keys.get(skill_id)
+            self._skills[skill_id] = skill
+            if old_key == key:
+                return
+            if old_key is not None:
+                self._names.remove((old_key, skill_id))
+                for entry in self._suffixes_of(old_key, skill_id):
+                    self._suffixes.remove(entry)
+            self._keys[skill_id] = key
+            insort(self._names, (key, skill_id))
+            for entry in self._suffixes_of(key, skill_id):
+                insort(self._suffixes, entry)
+
+    def add_many(self, rows: Iterable) -> None:
+        for row in rows:
+            self.add(row)
+
+    @staticmethod
+    def _suffixes_of(key: str, skill_id: str) -> List[Tuple[str, str, int]]:
+        entries = []
+        for start in range(len(key)):
+            if start == 0:
+                tier = PREFIX
+            elif not key[start - 1].isalnum() and key[start].isalnum():
+                tier = WORD_PREFIX
+            else:
+                tier = SUBSTRING
+            entries.append((key[start:], skill_id, tier))
+        return entries
+
+    def search(self, query: Optional[str], limit: int = 20, offset: int = 0) -> List[IndexedSkill]:
+        """Return ranked matches for ``query``; an empty query lists skills by name."""
+        needed = offset + limit
+        query = normalize_skill_name(query or "")
+        with self._lock:
+            if not query:
+                return [self._skills[skill_id] for _, skill_id in self._names[offset:needed]]
+
+            # Prefix matches outrank everything else, so they may be enough
+            lo = bisect_left(self._names, (query,))
+            hi = bisect_left(self._names, (query + UPPER_BOUND,))
+            if hi - lo >= needed:
+                ranked = nsmallest(
+                    needed,
+                    self._names[lo:hi],
+                    key=lambda entry: (entry[0] != query, len(entry[0]), entry[0])
+                )
+                return [self._skills[skill_id] for _, skill_id in ranked[offset:]]
+
+            best: Dict[str, int] = {}
+            lo = bisect_left(self._suffixes, (query,))
+            hi = bisect_left(self._suffixes, (query + UPPER_BOUND,))
+            for suffix, skill_id, tier in self._suffixes[lo:hi]:
+                if tier == PREFIX and suffix == query:
+                    tier = EXACT
+                if tier < best.get(skill_id, SUBSTRING + 1):
+                    best[skill_id] = tier
+
+            keys = self._keys
+            ranked = nsmallest(
+                needed,
+                best,
+                key=lambda skill_id: (best[skill_id], len(keys[skill_id]), keys[skill_id])
+            )
+            return [self._skills[skill_id] for skill_id in ranked[offset:]]
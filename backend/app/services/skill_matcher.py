@@ -0,0 +1,162 @@
+# app/services/skill_matcher.py
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Symbols that tell skills apart ("C", "C++", "C#") are spelled out; all
+# other punctuation and spacing is dropped ("React.js" == "ReactJS"). Letters
+# and digits of every script are kept, so "中文" and "Русский" stay apart
+SYMBOL_WORDS = {"+": "plus", "#": "sharp"}
+NON_KEY_CHARS = re.compile(r"[\W_]+")
+
+# Bump whenever skill_key changes, so stored normalized names are recomputed
+SKILL_KEY_VERSION = "2"
+
+# Names this short are only ever matched exactly ("Go" vs "Jo")
+MIN_FUZZY_LENGTH = 5
+# Below this, a single changed letter is as likely a different skill as a typo
+# ("MSSQL"/"MySQL", "Flash"/"Flask"), so only a swap of two adjacent letters
+# ("Pyhton") is corrected; from here on, up to max_distance edits of any kind
+MIN_EDIT_LENGTH = 8
+
+
+def skill_key(name: str) -> str:
+    """
+    Canonical spelling-insensitive key for a skill name. Empty for names of
+    punctuation alone, which can only be matched by their exact name.
+    """
+    key = unicodedata.normalize("NFKC", name).strip().casefold()
+    for symbol, word in SYMBOL_WORDS.items():
+        key = key.replace(symbol, word)
+    return NON_KEY_CHARS.sub("", key)
+
+
+def grouping_key(name: str) -> str:
+    """Key for spotting one skill sent twice: the skill key, or the exact name when that is empty."""
+    # Never collides with a skill key, which has no punctuation
+    return skill_key(name) or name
+
+
+def key_variants(key: str) -> List[str]:
+    """The key plus the spellings it is commonly written with ("nodejs" -> "node")."""
+    variants = [key]
+    if key.endswith("js") and len(key) > 4:
+        variants.append(key[:-2])
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (transpositions cost one), capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def is_transposition(a: str, b: str) -> bool:
+    """Whether ``b`` is ``a`` with exactly one pair of adjacent letters swapped."""
+    if len(a) != len(b):
+        return False
+    differences = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+    return (
+        len(differences) == 2 and differences[1] == differences[0] + 1
+        and a[differences[0]] == b[differences[1]] and a[differences[1]] == b[differences[0]]
+    )
+
+
+def deletes(key: str, distance: int) -> Set[str]:
+    """Every string obtained by removing up to ``distance`` characters from ``key``."""
+    results = {key}
+    frontier = {key}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        results |= frontier
+    return results
+
+
+class SkillMatcher:
+    """
+    Resolves a free-form skill name to an existing canonical skill.
+
+    Exact key matches are a dict lookup. Otherwise candidates within
+    ``max_distance`` edits come from a SymSpell-style table of deletions,
+    so a lookup costs a handful of dict probes however many skills there
+    are, and are verified with a bounded edit distance.
+    """
+
+    def __init__(self, max_distance: int = 1):
+        self.max_distance = max_distance
+        self._keys: Dict[str, Any] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def allowed_distance(self, key: str) -> int:
+        if len(key) < MIN_FUZZY_LENGTH:
+            return 0
+        if len(key) < MIN_EDIT_LENGTH:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    def load(self, rows: Iterable) -> None:
+        """Replace the contents with ``rows`` (anything with ``id`` and ``name``)."""
+        with self._lock:
+            self._keys = {}
+            self._deletes = {}
+        for row in rows:
+            self.add(row.name, row.id)
+
+    def add(self, name: str, skill_id: Any) -> None:
+        key = skill_key(name)
+        if not key:
+            return
+        with self._lock:
+            if key in self._keys:
+                return  # First spelling seen stays canonical
+            self._keys[key] = skill_id
+            for variant in key_variants(key):
+                self._keys.setdefault(variant, skill_id)
+                for deletion in deletes(variant, self.allowed_distance(variant)):
+                    self._deletes.setdefault(deletion, set()).add(variant)
+
+    def match(self, name: str) -> Optional[Any]:
+        """Return the id of the closest known skill, or None if nothing is close enough."""
+        key = skill_key(name)
+        if not key:
+            return None
+        with self._lock:
+            for variant in key_variants(key):
+                if variant in self._keys:
+                    return self._keys[variant]
+
+            best: Optional[Tuple[int, int, str]] = None
+            for variant in key_variants(key):
+                limit = self.allowed_distance(variant)
+                if not limit:
+                    continue
+                candidates: Set[str] = set()
+                for deletion in deletes(variant, limit):
+                    candidates |= self._deletes.get(deletion, set())
+                for candidate in candidates:
+                    if min(len(variant), len(candidate)) < MIN_EDIT_LENGTH and not is_transposition(variant, candidate):
+                        continue
+                    distance = edit_distance(variant, candidate, min(limit, self.allowed_distance(candidate)))
+                    if distance <= min(limit, self.allowed_distance(candidate)):
+                        ranked = (distance, abs(len(candidate) - len(variant)), candidate)
+                        if best is None or ranked < best:
+                            best = ranked
+            return self._keys[best[2]] if best else None
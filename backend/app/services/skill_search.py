@@ -0,0 +1,130 @@
+# app/services/skill_search.py
+import logging
+from typing import List
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.skills import Skill
+
+logger = logging.getLogger(__name__)
+
+# Trigram matching needs at least one full trigram
+MIN_QUERY_LENGTH = 3
+
+# Rowids mirror the skill table so triggers update single rows; searches
+# join on skill_id, which stays correct even if a VACUUM renumbers rowids
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS skill_fts
+    USING fts5(skill_id UNINDEXED, name, description, tokenize='trigram')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_fts_insert AFTER INSERT ON skill BEGIN
+        INSERT INTO skill_fts(rowid, skill_id, name, description)
+        VALUES (new.rowid, new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_fts_delete AFTER DELETE ON skill BEGIN
+        DELETE FROM skill_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS skill_fts_update AFTER UPDATE OF name, description ON skill BEGIN
+        DELETE FROM skill_fts WHERE rowid = old.rowid;
+        INSERT INTO skill_fts(rowid, skill_id, name, description)
+        VALUES (new.rowid, new.id, new.name, new.description);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_skill_name_trgm ON skill USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_skill_description_trgm ON skill USING gin (description gin_trgm_ops)",
+]
+
+# Name matches weigh ten times as much as description matches
+SQLITE_SEARCH = """
+    SELECT skill.* FROM skill_fts
+    JOIN skill ON skill.id = skill_fts.skill_id
+    WHERE skill_fts MATCH :match
+    ORDER BY bm25(skill_fts, 0.0, 10.0, 1.0), length(skill.name)
+    LIMIT :limit OFFSET :offset
+"""
+
+POSTGRES_SEARCH = """
+    SELECT skill.* FROM skill
+    WHERE skill.name ILIKE :pattern ESCAPE '\\' OR skill.description ILIKE :pattern ESCAPE '\\'
+    ORDER BY greatest(
+        similarity(skill.name, :query),
+        0.1 * similarity(coalesce(skill.description, ''), :query)
+    ) DESC, length(skill.name)
+    LIMIT :limit OFFSET :offset
+"""
+
+
+class SkillFullTextSearch:
+    """
+    Database-side skill search over name and description: an FTS5 trigram
+    table kept in sync by triggers on SQLite, pg_trgm indexes on Postgres.
+    """
+
+    def __init__(self):
+        self.dialect = None
+
+    @property
+    def available(self) -> bool:
+        return self.dialect is not None
+
+    def install(self, engine: Engine) -> bool:
+        """Create the search structures if this database supports them."""
+        dialect = engine.dialect.name
+        try:
+            with engine.begin() as conn:
+                if dialect == "sqlite":
+                    for statement in SQLITE_DDL:
+                        conn.execute(text(statement))
+                    indexed = conn.execute(text("SELECT count(*) FROM skill_fts")).scalar()
+                    total = conn.execute(text("SELECT count(*) FROM skill")).scalar()
+                    if indexed != total:
+                        # First run, or rows written while the triggers did not exist
+                        conn.execute(text("DELETE FROM skill_fts"))
+                        conn.execute(text(
+                            "INSERT INTO skill_fts(rowid, skill_id, name, description) "
+                            "SELECT rowid, id, name, description FROM skill"
+                        ))
+                        logger.info(f"Indexed {total} skills for full-text search")
+                elif dialect == "postgresql":
+                    for statement in POSTGRES_DDL:
+                        conn.execute(text(statement))
+                else:
+                    logger.info(f"No full-text skill search for {dialect}")
+                    return False
+        except SQLAlchemyError as e:
+            # e.g. SQLite older than 3.34 (no trigram tokenizer) or no rights to add pg_trgm
+            logger.warning(f"Full-text skill search unavailable: {e}")
+            return False
+
+        self.dialect = dialect
+        return True
+
+    def search(self, db: Session, query: str, limit: int = 20, offset: int = 0) -> List[Skill]:
+        """Skills whose name or description contains ``query``, best ranked first."""
+        query = query.strip()
+        if self.dialect == "sqlite":
+            statement = text(SQLITE_SEARCH).bindparams(
+                match='"' + query.replace('"', '""') + '"', limit=limit, offset=offset
+            )
+        else:
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            statement = text(POSTGRES_SEARCH).bindparams(
+                pattern=f"%{escaped}%", query=query, limit=limit, offset=offset
+            )
+        return list(db.scalars(select(Skill).from_statement(statement)))
+
+
+skill_fts = SkillFullTextSearch()
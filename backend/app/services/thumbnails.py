@@ -0,0 +1,220 @@
+# app/services/thumbnails.py
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Dict, Optional
+
+from app.services.compile_pool import run_process
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTHS = (160, 320, 640)
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+CACHED_SUFFIXES = (".pdf", ".png", ".webp")
+
+try:
+    from PIL import Image  # Optional: only needed for WebP output
+except ImportError:
+    Image = None
+
+
+class RasterizationError(Exception):
+    """Raised when page 1 of a PDF could not be rendered."""
+
+
+def file_sha256(file: BinaryIO) -> str:
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(1024 * 1024), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ThumbnailCache:
+    """
+    Page-1 renders of compiled PDFs at a few fixed widths, stored under the
+    PDF's content hash so they never need invalidating. The PDF is kept
+    next to them, so a width or format not rendered yet can be made from
+    the hash alone. Like PdfCache, the directory has a size cap with
+    least-recently-used eviction tracked through file mtimes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._disk_bytes: Optional[int] = None
+        self.hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_format(image_format: str) -> str:
+        """WebP needs Pillow; fall back to PNG when it is not installed."""
+        if image_format == "webp" and Image is not None:
+            return "webp"
+        return "png"
+
+    def path(self, pdf_hash: str, width: int, image_format: str = "png") -> str:
+        return os.path.join(self.directory, pdf_hash[:2], f"{pdf_hash}-{width}.{image_format}")
+
+    def source_path(self, pdf_hash: str) -> str:
+        return os.path.join(self.directory, pdf_hash[:2], f"{pdf_hash}.pdf")
+
+    def open(self, pdf_hash: str, width: int, image_format: str = "png") -> Optional[BinaryIO]:
+        """Open a rendered thumbnail, or None if it is not cached."""
+        return self._open(self.path(pdf_hash, width, image_format))
+
+    async def render(self, pdf_file: BinaryIO, width: int, image_format: str = "png") -> str:
+        """Make sure the open PDF has a thumbnail at this size; returns the PDF's hash."""
+        pdf_hash = file_sha256(pdf_file)
+        source = self.source_path(pdf_hash)
+        if not os.path.isfile(source):
+            pdf_file.seek(0)
+            self._store(source, lambda f: shutil.copyfileobj(pdf_file, f))
+        thumbnail = await self._render(pdf_hash, pdf_file, width, image_format)
+        thumbnail.close()
+        return pdf_hash
+
+    async def render_hash(self, pdf_hash: str, width: int, image_format: str = "png") -> Optional[BinaryIO]:
+        """Open thumbnail for a PDF rendered here before, rendering this size if needed; None if unknown."""
+        source = self._open(self.source_path(pdf_hash))
+        if source is None:
+            return None
+        with source:
+            return await self._render(pdf_hash, source, width, image_format)
+
+    def _open(self, path: str) -> Optional[BinaryIO]:
+        try:
+            file = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            # Refresh recency for LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return file
+
+    async def _render(self, pdf_hash: str, pdf_file: BinaryIO, width: int, image_format: str) -> BinaryIO:
+        if width not in THUMBNAIL_WIDTHS:
+            raise ValueError(f"Width must be one of {THUMBNAIL_WIDTHS}")
+        image_format = self.normalize_format(image_format)
+
+        target = self.path(pdf_hash, width, image_format)
+        thumbnail = self._open(target)
+        if thumbnail is not None:
+            self.hits += 1
+            return thumbnail
+
+        lock = self._locks.setdefault(target, asyncio.Lock())
+        async with lock:
+            thumbnail = self._open(target)
+            if thumbnail is not None:
+                self.hits += 1
+                return thumbnail
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            work_dir = tempfile.mkdtemp(dir=os.path.dirname(target))
+            try:
+                # Render from a private copy so eviction cannot pull the PDF away
+                pdf_path = os.path.join(work_dir, "source.pdf")
+                pdf_file.seek(0)
+                with open(pdf_path, "wb") as f:
+                    shutil.copyfileobj(pdf_file, f)
+
+                prefix = os.path.join(work_dir, "page")
+                process = await run_process([
+                    'pdftoppm',
+                    '-f', '1', '-l', '1',
+                    '-singlefile',
+                    '-png',
+                    '-scale-to-x', str(width),
+                    '-scale-to-y', '-1',
+                    pdf_path,
+                    prefix
+                ])
+                png_path = f"{prefix}.png"
+                if process.returncode != 0 or not os.path.isfile(png_path):
+                    raise RasterizationError(process.stderr.strip() or "pdftoppm failed")
+
+                if image_format == "webp":
+                    webp_path = f"{prefix}.webp"
+                    await asyncio.to_thread(
+                        lambda: Image.open(png_path).save(webp_path, "WEBP", quality=80)
+                    )
+                    png_path = webp_path
+
+                # Open before publishing so the caller keeps it even if evicted
+                thumbnail = open(png_path, "rb")
+                os.replace(png_path, target)
+                self.renders += 1
+            finally:
+                for name in os.listdir(work_dir):
+                    os.remove(os.path.join(work_dir, name))
+                os.rmdir(work_dir)
+            self._locks.pop(target, None)
+        self._added(os.fstat(thumbnail.fileno()).st_size)
+        return thumbnail
+
+    def _store(self, path: str, writer) -> None:
+        """Write a file through ``writer`` and publish it atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._added(os.path.getsize(path))
+
+    def _added(self, size: int) -> None:
+        if self._disk_bytes is not None:
+            self._disk_bytes += size
+        if self._disk_bytes is None or self._disk_bytes > self.max_bytes:
+            self._evict()
+
+    def _scan(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                # Cached files sit in the shard named after their hash; this
+                # skips partial writes and files inside render work dirs
+                if not name.endswith(CACHED_SUFFIXES) or os.path.basename(root) != name[:2]:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used files until the directory fits its budget."""
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        self._disk_bytes = total
+        self.evictions += evicted
+        if evicted:
+            logger.info(f"Evicted {evicted} thumbnail files, {total} bytes remain")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "renders": self.renders, "evictions": self.evictions}
@@ -1,65 +1,159 @@
 # app/utils/latex.py
-import os
-import tempfile
-import subprocess
-from pathlib import Path
+import asyncio
+import re
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
 from fastapi import HTTPException
+from app.core.settings import settings
+from app.services.compile_pool import (
+    CompilePool,
+    CompileQueueFull,
+    CompileTimeout,
+)
+from app.services.latex_engines import LatexCompileError, LatexEngine
+from app.services.sandbox import SandboxPool
+from app.utils.pdf import (
+    pdf_cache,
+    format_cache,
+    engine_selector,
+)
+
+# Shared by every request in this worker process
+compile_pool = CompilePool(
+    workers=settings.COMPILE_WORKERS,
+    queue_depth=settings.COMPILE_QUEUE_DEPTH,
+    timeout=settings.COMPILE_TIMEOUT,
+)
+
+# One scratch directory per compile worker, on tmpfs when available
+sandbox_pool = SandboxPool(
+    size=settings.COMPILE_WORKERS,
+    root=settings.COMPILE_SANDBOX_ROOT or None,
+)
+
+# Backend choice, cache, formats and passes for every compile path
+latex_engine = LatexEngine(
+    pool=compile_pool,
+    sandboxes=sandbox_pool,
+    pdf_cache=pdf_cache,
+    format_cache=format_cache,
+    selector=engine_selector,
+)
+
+# Batch jobs may occupy at most this many workers, keeping the rest for previews
+BATCH_COMPILE_CONCURRENCY = settings.BATCH_COMPILE_CONCURRENCY or max(1, compile_pool.workers - 1)
+_batch_semaphore: Optional[asyncio.Semaphore] = None
+
+LATEX_SPECIAL_CHARS = {
+    '\\': r'\textbackslash{}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+}
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def escape_latex(value: str) -> str:
+    return "".join(LATEX_SPECIAL_CHARS.get(char, char) for char in value)
+
+
+def render_latex_template(template: str, parameters: Dict[str, str]) -> str:
+    """Fill {{name}} placeholders with LaTeX-escaped values; unknown names are left as-is."""
+    def replace(match):
+        key = match.group(1)
+        return escape_latex(parameters[key]) if key in parameters else match.group(0)
+    return PLACEHOLDER_PATTERN.sub(replace, template)
+
 
 class LatexCompiler:
     @staticmethod
     async def compile_latex(content: str) -> bytes:
-        # Create a temporary directory with a random name
-        temp_dir = tempfile.mkdtemp()
-        tex_path = os.path.join(temp_dir, "temp.tex")
-        
+        """Compile LaTeX source to PDF bytes (for callers that need them in memory)."""
+        return await LatexCompiler._run(latex_engine.compile(content))
+
+    @staticmethod
+    async def compile_latex_to_path(content: str) -> str:
+        """Compile LaTeX source and return the path of the cached PDF, for streaming."""
+        return await LatexCompiler._run(latex_engine.compile_to_path(content))
+
+    @staticmethod
+    async def open_compiled_pdf(content: str) -> BinaryIO:
+        """Compile LaTeX source and return the cached PDF opened for reading, for streaming."""
+        return await LatexCompiler._run(latex_engine.open_pdf(content))
+
+    @staticmethod
+    async def _run(compile_job):
+        """Await an engine compile, mapping its failures to HTTP errors."""
         try:
-            # Write the LaTeX content to temp file
-            with open(tex_path, 'w') as f:
-                f.write(content)
-
-            # Compile to PDF
-            process = subprocess.run(
-                [
-                    'pdflatex',
-                    '-interaction=nonstopmode',
-                    '-halt-on-error',
-                    tex_path
-                ],
-                cwd=temp_dir,
-                capture_output=True,
-                text=True
+            return await compile_job
+        except LatexCompileError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except CompileQueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Compile server is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        except CompileTimeout:
+            raise HTTPException(
+                status_code=504,
+                detail="LaTeX compilation timed out"
             )
 
-            pdf_path = os.path.join(temp_dir, "temp.pdf")
-            log_path = os.path.join(temp_dir, "temp.log")
-
-            if process.returncode != 0:
-                # Get error from log if available
-                error_msg = "LaTeX compilation failed"
-                if os.path.exists(log_path):
-                    with open(log_path, 'r') as f:
-                        log_content = f.read()
-                        if '!' in log_content:
-                            error_msg = log_content.split('!')[1].split('\n')[0]
-                raise HTTPException(status_code=400, detail=error_msg)
-
-            # Read the generated PDF
-            if os.path.exists(pdf_path):
-                with open(pdf_path, 'rb') as f:
-                    return f.read()
-            else:
-                raise HTTPException(
-                    status_code=500, 
-                    detail="PDF file was not generated"
-                )
+    @staticmethod
+    async def compile_many(
+        contents: List[str]
+    ) -> AsyncIterator[Tuple[int, Optional[bytes], Optional[str]]]:
+        """
+        Compile several sources in parallel, yielding (index, pdf_bytes, error)
+        in completion order. A failing item never ends the batch: its error is
+        reported instead. All batches together share BATCH_COMPILE_CONCURRENCY
+        workers.
+        """
+        global _batch_semaphore
+        if _batch_semaphore is None:
+            _batch_semaphore = asyncio.Semaphore(BATCH_COMPILE_CONCURRENCY)
+
+        async def compile_one(index: int, content: str):
+            async with _batch_semaphore:
+                try:
+                    # Read now: the cached file may be evicted while the rest compile
+                    return index, await LatexCompiler.compile_latex(content), None
+                except HTTPException as e:
+                    return index, None, str(e.detail)
+                except asyncio.CancelledError:
+                    if stopping:
+                        raise
+                    # Cancelled inside the pool (e.g. on shutdown), not by us
+                    return index, None, "Compilation was cancelled"
+                except Exception as e:
+                    return index, None, f"Compilation failed: {e}"
 
+        stopping = False
+        tasks = [
+            asyncio.ensure_future(compile_one(index, content))
+            for index, content in enumerate(contents)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
         finally:
-            # Cleanup all temporary files
-            for ext in ['.tex', '.aux', '.log', '.pdf', '.out']:
-                file_path = os.path.join(temp_dir, f"temp{ext}")
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            try:
-                os.rmdir(temp_dir)
-            except OSError:
-                pass
\ No newline at end of file
+            # Client went away: stop the rest of the batch
+            stopping = True
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def stats() -> dict:
+        """Queue-wait and compile-time figures for sizing the pool, plus cache hit rates."""
+        return {
+            **compile_pool.stats(),
+            "cache": pdf_cache.stats(),
+            "formats": format_cache.stats(),
+            "engine": latex_engine.stats()
+        }
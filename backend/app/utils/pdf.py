@@ -1,96 +1,104 @@
 import os
-import subprocess
+import shutil
 import tempfile
-import re
+import time
+from app.core.settings import settings
+from app.services.pdf_cache import PdfCache
+from app.services.latex_formats import FormatCache
+from app.services.compile_pool import CompileQueueFull, CompileTimeout
+from app.services.latex_engines import EngineSelector, LatexCompileError
+from app.services.thumbnails import ThumbnailCache
 
+# Shared by LatexCompiler and convert_latex_to_pdf
+pdf_cache = PdfCache(
+    directory=settings.PDF_CACHE_DIR,
+    max_bytes=settings.PDF_CACHE_MAX_BYTES,
+    memory_items=settings.PDF_CACHE_MEMORY_ITEMS,
+)
 
-def sanitize_latex_error_message(message: str) -> str:
-    """
-    Extract meaningful LaTeX error messages from pdflatex output.
-    Removes system paths and internal log details.
-    """
-    # Extract the most common errors
-    error_patterns = [
-        r"! LaTeX Error: (.*)",  # Capture LaTeX-specific errors
-        r"! Undefined control sequence\.\s*(.*)",  # Undefined commands
-        r"! Missing number, treated as zero\.",  # Missing number
-        r"! Missing \\\\[A-Za-z]+",  # Missing \begin, \end, etc.
-        r"! Extra \\\\[A-Za-z]+",  # Extra \end or similar
-        r"l\.(\d+) (.*)",  # Line number errors
-    ]
-    
-    extracted_errors = []
-    for pattern in error_patterns:
-        matches = re.findall(pattern, message)
-        for match in matches:
-            if isinstance(match, tuple):
-                extracted_errors.append(f"Line {match[0]}: {match[1]}")
-            else:
-                extracted_errors.append(match)
-    
-    # Limit to first 5 unique errors to avoid information overload
-    extracted_errors = list(dict.fromkeys(extracted_errors))[:5]
-    return "\n".join(extracted_errors) if extracted_errors else "Unknown LaTeX error."
+thumbnail_cache = ThumbnailCache(
+    directory=settings.THUMBNAIL_DIR,
+    max_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES,
+)
+
+# Preambles are registered at startup when LATEX_PRECOMPILE_FORMATS is on
+format_cache = FormatCache(directory=settings.LATEX_FORMAT_DIR)
+
+# LATEX_ENGINE=auto benchmarks the installed engines once per template
+engine_selector = EngineSelector(
+    path=settings.LATEX_ENGINE_SELECTION_FILE,
+    forced=None if settings.LATEX_ENGINE == "auto" else settings.LATEX_ENGINE,
+)
 
 
 def convert_latex_to_pdf(latex_filepath: str, output_directory: str = None, compile_timeout: int = 30) -> str:
     """
-    Converts a LaTeX (.tex) file to a PDF using pdflatex, while handling errors gracefully.
-    Runs pdflatex twice to resolve cross-references.
+    Converts a LaTeX (.tex) file to a PDF, while handling errors gracefully.
+    Synchronous counterpart of LatexEngine for scripts and tooling: the same
+    engine and compile pool do the compile, so backend choice, PDF cache,
+    precompiled formats and adaptive passes all match the API's. Only the
+    source is copied into the sandbox; files it includes are found in its
+    own directory through TEXINPUTS. Call it from a worker thread, not from
+    the event loop.
 
     Args:
         latex_filepath (str): Path to the LaTeX file
         output_directory (str, optional): Directory for output files
         compile_timeout (int): Time limit for compilation (in seconds)
-    
+
     Returns:
         str: Path to the generated PDF file
-    
+
     Raises:
         RuntimeError: If the LaTeX file cannot be compiled
     """
+    # app.utils.latex builds the engine from this module's caches
+    from app.utils.latex import latex_engine
+
     if not os.path.isfile(latex_filepath):
         raise FileNotFoundError(f"The file '{latex_filepath}' does not exist.")
 
     if not latex_filepath.endswith(".tex"):
         raise ValueError("The input file must be a LaTeX (.tex) file.")
-    
+
     latex_directory = os.path.dirname(latex_filepath)
     latex_filename = os.path.basename(latex_filepath)
-    
+
     if not output_directory:
         output_directory = latex_directory if latex_directory else '.'
-    
+
     if not os.path.isdir(output_directory):
         raise NotADirectoryError(f"The directory '{output_directory}' does not exist.")
-    
-    original_directory = os.getcwd()
-    os.chdir(latex_directory if latex_directory else '.')
-    
-    try:
-        command = [
-            'pdflatex',
-            '-interaction=nonstopmode',
-            '-output-directory', output_directory,
-            latex_filename
-        ]
-        
-        for i in range(2):  # Run pdflatex twice to ensure references are resolved
-            try:
-                result = subprocess.run(command, capture_output=True, text=True, timeout=compile_timeout)
-            except subprocess.TimeoutExpired:
-                raise RuntimeError("PDF generation timed out. Please check your LaTeX file for long-running tasks.")
-            
-            if result.returncode != 0:
-                error_message = sanitize_latex_error_message(result.stderr)
-                raise RuntimeError(f"LaTeX compilation failed: {error_message}")
-        
-        pdf_filename = os.path.splitext(latex_filename)[0] + ".pdf"
-        pdf_path = os.path.join(output_directory, pdf_filename)
-        
-        if not os.path.isfile(pdf_path):
-            raise FileNotFoundError(f"The PDF file '{pdf_path}' was not created.")
-        
-        return pdf_path
-    finally:
-        os.chdir(original_directory)
\ No newline at end of file
+
+    job_name = os.path.splitext(latex_filename)[0]
+    pdf_path = os.path.join(os.path.abspath(output_directory), f"{job_name}.pdf")
+
+    with open(latex_filepath, 'r') as f:
+        source = f.read()
+    backend = latex_engine.backend_for(source)
+    cache_key = latex_engine.cache_key(source, backend)
+    cached_path = pdf_cache.get_path(cache_key)
+    if cached_path:
+        try:
+            shutil.copyfile(cached_path, pdf_path)
+            return pdf_path
+        except OSError:
+            pass  # Evicted by another worker meanwhile, compile as usual
+
+    with tempfile.TemporaryDirectory(prefix="latex-") as work_dir:
+        started = time.monotonic()
+        try:
+            compiled = latex_engine.run_sync(
+                source, backend, work_dir,
+                search_path=os.path.abspath(latex_directory or '.'), timeout=compile_timeout
+            )
+        except CompileTimeout:
+            raise RuntimeError("PDF generation timed out. Please check your LaTeX file for long-running tasks.")
+        except CompileQueueFull:
+            raise RuntimeError("The compile pool is busy. Please try again shortly.")
+        except LatexCompileError as e:
+            raise RuntimeError(f"LaTeX compilation failed: {e}")
+        pdf_cache.record_compile(time.monotonic() - started)
+        shutil.copyfile(compiled, pdf_path)
+        pdf_cache.put_file(cache_key, compiled)
+    return pdf_path
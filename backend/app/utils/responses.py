@@ -0,0 +1,22 @@
+# app/utils/responses.py
+from typing import BinaryIO, Dict, Optional
+
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+
+
+def open_file_response(
+    file: BinaryIO, media_type: str, headers: Optional[Dict[str, str]] = None
+) -> FileResponse:
+    """
+    Serve an already open file with FileResponse, closing it once sent.
+
+    The response reopens it through /proc/self/fd, which still reaches the
+    file after a cache has evicted (unlinked) it, unlike its original path.
+    """
+    return FileResponse(
+        f"/proc/self/fd/{file.fileno()}",
+        media_type=media_type,
+        headers=headers,
+        background=BackgroundTask(file.close),
+    )
@@ -0,0 +1,46 @@
+# gunicorn.conf.py
+"""
+Pre-fork serving: gunicorn -c gunicorn.conf.py app.main:app
+
+The app and its heavy models are loaded once in the master and shared with
+the workers copy-on-write. gc.freeze() moves everything allocated so far out
+of the collector's reach, so collections in the workers don't write to (and
+copy) those shared pages.
+
+Importing the app opens database connections (create_all) in the master.
+Workers must never use those inherited sockets, so each worker starts with
+an empty pool of its own.
+"""
+import gc
+import logging
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported, before any worker forks
+    from app.core.skill_categorization import get_categorizer
+
+    get_categorizer()
+    # Close the master's connections before the objects referring to them are frozen
+    from app.core.database import engine
+
+    engine.dispose()
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded the skill categorizer; {gc.get_freeze_count()} objects frozen")
+
+
+
+def post_fork(server, worker):
+    # Anything still pooled belongs to the master: forget it without closing it
+    from app.core.database import engine
+
+    engine.dispose(close=False)
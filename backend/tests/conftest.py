@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+# Settings are read from the environment when app modules are imported. Tests
+# run against a throwaway SQLite database and need no real credentials.
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="resarch-tests-"), "test.db")
+for name in (
+    "SECRET_KEY", "OPENAI_API_KEY", "GITHUB_TOKEN", "GROQ_API_KEY",
+    "CLOUDINARY_CLOUD_NAME", "CLOUDINARY_API_KEY", "CLOUDINARY_API_SECRET",
+):
+    os.environ.setdefault(name, "test")
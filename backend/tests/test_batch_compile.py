@@ -0,0 +1,24 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from app.utils.latex import LatexCompiler
+
+
+def test_failing_items_are_reported_without_ending_the_batch(monkeypatch):
+    async def compile_latex(content):
+        if content == "bad":
+            raise HTTPException(status_code=400, detail="Undefined control sequence")
+        if content == "gone":
+            raise FileNotFoundError("cache entry vanished")
+        return b"%PDF-" + content.encode()
+
+    monkeypatch.setattr(LatexCompiler, "compile_latex", staticmethod(compile_latex))
+
+    async def collect():
+        return [item async for item in LatexCompiler.compile_many(["a", "bad", "gone", "b"])]
+
+    results = {index: (pdf, error) for index, pdf, error in asyncio.run(collect())}
+    assert results[0] == (b"%PDF-a", None) and results[3] == (b"%PDF-b", None)
+    assert results[1] == (None, "Undefined control sequence")
+    assert results[2][0] is None and "cache entry vanished" in results[2][1]
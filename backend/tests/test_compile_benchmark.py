@@ -0,0 +1,257 @@
+"""
+Compile benchmarks over the bundled templates in app/data/resumes.
+
+Slow and machine-dependent, so only run when asked:
+
+    RUN_COMPILE_BENCHMARKS=1 python -m pytest -q tests/test_compile_benchmark.py
+
+Each run writes its figures to tests/benchmarks/latest.json (override with
+COMPILE_BENCHMARK_RESULTS) and fails if they are worse than
+tests/benchmarks/compile_baseline.json by more than
+COMPILE_BENCHMARK_TOLERANCE (default 0.25). Record a new baseline on the
+reference machine with COMPILE_BENCHMARK_UPDATE=1. Without a committed
+baseline the run fails, after saving its figures as the baseline to commit.
+"""
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+TEMPLATE_DIR = BACKEND_DIR / "app" / "data" / "resumes"
+BENCHMARK_DIR = Path(__file__).resolve().parent / "benchmarks"
+BASELINE_PATH = BENCHMARK_DIR / "compile_baseline.json"
+RESULTS_PATH = Path(os.environ.get("COMPILE_BENCHMARK_RESULTS", BENCHMARK_DIR / "latest.json"))
+TOLERANCE = float(os.environ.get("COMPILE_BENCHMARK_TOLERANCE", "0.25"))
+ENGINE = os.environ.get("COMPILE_BENCHMARK_ENGINE", "pdflatex")
+
+WARM_RUNS = 3
+CONCURRENCY_LEVELS = (1, 4, 16)
+JOBS_PER_CLIENT = 2
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Compare a run against the baseline; entries missing from either side are ignored."""
+    regressions = []
+    for name, base in baseline.get("templates", {}).items():
+        current = results.get("templates", {}).get(name)
+        if not current or current.get("error") or base.get("error"):
+            continue
+        for metric in ("cold_seconds", "warm_seconds", "convert_seconds"):
+            if metric in base and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name} {metric}: {current[metric]:.3f}s vs baseline {base[metric]:.3f}s"
+                )
+        if current["passes"] > base.get("passes", current["passes"]):
+            regressions.append(f"{name} passes: {current['passes']} vs baseline {base['passes']}")
+
+    for level, base in baseline.get("throughput", {}).items():
+        current = results.get("throughput", {}).get(level)
+        if current and current["compiles_per_second"] < base["compiles_per_second"] / (1 + tolerance):
+            regressions.append(
+                f"throughput at concurrency {level}: {current['compiles_per_second']:.2f}/s "
+                f"vs baseline {base['compiles_per_second']:.2f}/s"
+            )
+    return regressions
+
+
+def _variant(source: str, run: int) -> str:
+    """Same document, different cache key: only a trailing comment changes."""
+    return f"{source}\n% benchmark run {run}\n"
+
+
+def _passes_used(compile_passes, before: Dict[int, int]) -> int:
+    changed = [passes for passes, count in compile_passes.items() if count > before.get(passes, 0)]
+    return max(changed) if changed else 0
+
+
+async def _benchmark_templates(latex, pdf, compile_passes, work_dir: Path) -> Dict[str, dict]:
+    from fastapi import HTTPException
+
+    results = {}
+    for tex_file in sorted(TEMPLATE_DIR.glob("*.tex")):
+        source = tex_file.read_text()
+        entry = {}
+        try:
+            before = dict(compile_passes)
+            started = time.perf_counter()
+            await latex.LatexCompiler.compile_latex_to_path(source)
+            entry["cold_seconds"] = time.perf_counter() - started
+            entry["passes"] = _passes_used(compile_passes, before)
+
+            warm = []
+            for run in range(WARM_RUNS):
+                started = time.perf_counter()
+                await latex.LatexCompiler.compile_latex_to_path(_variant(source, run))
+                warm.append(time.perf_counter() - started)
+            entry["warm_seconds"] = statistics.median(warm)
+
+            started = time.perf_counter()
+            await latex.LatexCompiler.compile_latex_to_path(source)
+            entry["cached_seconds"] = time.perf_counter() - started
+
+            # Synchronous path, against the same caches and formats
+            tex_path = work_dir / f"{tex_file.stem}.tex"
+            tex_path.write_text(_variant(source, WARM_RUNS))
+            started = time.perf_counter()
+            await asyncio.to_thread(pdf.convert_latex_to_pdf, str(tex_path), str(work_dir))
+            entry["convert_seconds"] = time.perf_counter() - started
+        except (HTTPException, RuntimeError) as e:
+            entry = {"error": str(getattr(e, "detail", e))}
+        results[tex_file.stem] = entry
+    return results
+
+
+async def _benchmark_throughput(latex, sources: List[str]) -> Dict[str, dict]:
+    results = {}
+    run = 1000
+    for level in CONCURRENCY_LEVELS:
+        jobs = []
+        for index in range(level * JOBS_PER_CLIENT):
+            jobs.append(_variant(sources[index % len(sources)], run))
+            run += 1
+
+        semaphore = asyncio.Semaphore(level)
+        latencies = []
+
+        async def client(source: str):
+            async with semaphore:
+                started = time.perf_counter()
+                await latex.LatexCompiler.compile_latex_to_path(source)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(source) for source in jobs))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        results[str(level)] = {
+            "compiles": len(jobs),
+            "seconds": elapsed,
+            "compiles_per_second": len(jobs) / elapsed,
+            "p50_seconds": latencies[len(latencies) // 2],
+            "p95_seconds": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        }
+    return results
+
+
+@pytest.mark.skipif(
+    os.environ.get("RUN_COMPILE_BENCHMARKS") != "1",
+    reason="set RUN_COMPILE_BENCHMARKS=1 to run compile benchmarks"
+)
+def test_compile_benchmark(tmp_path, monkeypatch):
+    if shutil.which(ENGINE) is None:
+        pytest.skip(f"{ENGINE} is not installed")
+    pytest.importorskip("fastapi")
+
+    from app.services.compile_pool import CompilePool
+    from app.services.latex_engines import EngineSelector, LatexEngine, compile_passes
+    from app.services.latex_formats import FormatCache
+    from app.services.pdf_cache import PdfCache
+    from app.services.sandbox import SandboxPool
+    from app.utils import latex, pdf
+
+    # Fresh caches so the first compile of each template is genuinely cold
+    pdf_cache = PdfCache(directory=str(tmp_path / "pdf-cache"), max_bytes=1024 ** 3)
+    format_cache = FormatCache(directory=str(tmp_path / "formats"))
+    format_cache.register_directory(TEMPLATE_DIR)
+    selector = EngineSelector(path=str(tmp_path / "selection.json"), forced=ENGINE)
+    workers = latex.settings.COMPILE_WORKERS
+    sandboxes = SandboxPool(size=workers, root=str(tmp_path))
+    work_dir = tmp_path / "convert"
+    work_dir.mkdir()
+
+    async def run():
+        pool = CompilePool(
+            workers=workers,
+            queue_depth=max(CONCURRENCY_LEVELS) * JOBS_PER_CLIENT,
+            timeout=latex.settings.COMPILE_TIMEOUT,
+        )
+        engine = LatexEngine(
+            pool=pool,
+            sandboxes=sandboxes,
+            pdf_cache=pdf_cache,
+            format_cache=format_cache,
+            selector=selector,
+        )
+        monkeypatch.setattr(latex, "latex_engine", engine)
+        monkeypatch.setattr(pdf, "pdf_cache", pdf_cache)
+        monkeypatch.setattr(pdf, "format_cache", format_cache)
+        monkeypatch.setattr(pdf, "engine_selector", selector)
+        try:
+            templates = await _benchmark_templates(latex, pdf, compile_passes, work_dir)
+            sources = [
+                (TEMPLATE_DIR / f"{name}.tex").read_text()
+                for name, entry in templates.items() if "error" not in entry
+            ]
+            throughput = await _benchmark_throughput(latex, sources) if sources else {}
+        finally:
+            await engine.shutdown()
+            await pool.shutdown()
+            sandboxes.close()
+        return templates, throughput
+
+    templates, throughput = asyncio.run(run())
+    assert any("error" not in entry for entry in templates.values()), templates
+
+    # ru_maxrss is in kilobytes on Linux; children covers every TeX process run
+    results = {
+        "engine": ENGINE,
+        "workers": workers,
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "templates": templates,
+        "throughput": throughput,
+        "memory": {
+            "peak_tex_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+            "peak_self_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+    }
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(results, indent=2))
+
+    if os.environ.get("COMPILE_BENCHMARK_UPDATE") == "1":
+        BASELINE_PATH.write_text(json.dumps(results, indent=2))
+        return
+    if not BASELINE_PATH.exists():
+        # A run that compares against nothing must not pass silently
+        BASELINE_PATH.write_text(json.dumps(results, indent=2))
+        pytest.fail(
+            f"No compile baseline to compare against. This run was recorded as {BASELINE_PATH}; "
+            "commit it if it came from the reference machine, then rerun."
+        )
+
+    baseline = json.loads(BASELINE_PATH.read_text())
+    regressions = find_regressions(results, baseline, TOLERANCE)
+    assert not regressions, "Compile benchmark regressed:\n" + "\n".join(regressions)
+
+
+def test_find_regressions_flags_slower_runs():
+    baseline = {
+        "templates": {
+            "A": {"cold_seconds": 1.0, "warm_seconds": 0.5, "convert_seconds": 0.5, "passes": 1},
+            "Broken": {"error": "missing .sty"},
+        },
+        "throughput": {"4": {"compiles_per_second": 8.0}},
+    }
+    results = {
+        "templates": {
+            "A": {"cold_seconds": 1.1, "warm_seconds": 0.9, "convert_seconds": 0.5, "passes": 2},
+            "Broken": {"error": "missing .sty"},
+        },
+        "throughput": {"4": {"compiles_per_second": 5.0}},
+    }
+    regressions = find_regressions(results, baseline, tolerance=0.25)
+    assert len(regressions) == 3
+    assert any("warm_seconds" in line for line in regressions)
+    assert any("passes" in line for line in regressions)
+    assert any("concurrency 4" in line for line in regressions)
+    assert find_regressions(results, results, tolerance=0.0) == []
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.compile_pool import (
+    CompilePool,
+    CompileQueueFull,
+    CompileTimeout,
+    run_process,
+)
+
+
+def test_run_process_captures_output():
+    result = asyncio.run(run_process(["sh", "-c", "echo out; echo err >&2; exit 3"]))
+    assert result.returncode == 3
+    assert result.stdout.strip() == "out"
+    assert result.stderr.strip() == "err"
+
+
+def test_timeout_kills_process_tree():
+    async def scenario():
+        pool = CompilePool(workers=1, queue_depth=1, timeout=0.5)
+        started = time.monotonic()
+        with pytest.raises(CompileTimeout):
+            # The backgrounded grandchild must die with the group too
+            await pool.submit(lambda: run_process(["sh", "-c", "sleep 30 & sleep 30"]))
+        elapsed = time.monotonic() - started
+        await pool.shutdown()
+        return elapsed, pool.stats()
+
+    elapsed, stats = asyncio.run(scenario())
+    assert elapsed < 5
+    assert stats["timeouts"] == 1
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario():
+        pool = CompilePool(workers=1, queue_depth=1, timeout=5)
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+            return "done"
+
+        running = asyncio.ensure_future(pool.submit(blocker))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(pool.submit(blocker))
+        await asyncio.sleep(0)
+        with pytest.raises(CompileQueueFull):
+            await pool.submit(blocker)
+
+        release.set()
+        results = await asyncio.gather(running, queued)
+        await pool.shutdown()
+        return results, pool.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == ["done", "done"]
+    assert stats["rejected"] == 1
+    assert stats["queue_wait"]["count"] == 2
@@ -0,0 +1,107 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.llm_cache import LLMExtraction
+from app.models.skills import SkillCategory
+from app.services.extraction_cache import ExtractionCache
+
+SKILLS = [("Python", SkillCategory.TECHNICAL), ("Teamwork", SkillCategory.SOFT)]
+
+
+def sessions(url, **options):
+    engine = create_engine(url, **options)
+    LLMExtraction.__table__.create(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def make_session():
+    engine, make = sessions("sqlite://", poolclass=StaticPool)
+    yield make
+    engine.dispose()
+
+
+def put(cache, db, key, skills=SKILLS, latency=2.0):
+    cache.put(db, key, "model", "1", skills, latency)
+
+
+def test_expired_entries_miss_and_are_replaced(make_session):
+    db = make_session()
+    cache = ExtractionCache(ttl_seconds=60, max_entries=10)
+    put(cache, db, "a")
+    assert cache.get(db, "a") == SKILLS
+
+    db.execute(update(LLMExtraction).values(created_at=datetime.utcnow() - timedelta(minutes=5)))
+    db.commit()
+    assert cache.get(db, "a") is None
+
+    fresh = [("Rust", SkillCategory.TECHNICAL)]
+    put(cache, db, "a", fresh)
+    assert cache.get(db, "a") == fresh
+    assert db.get(LLMExtraction, "a").hits == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_least_recently_used_entries_are_evicted(make_session):
+    db = make_session()
+    cache = ExtractionCache(ttl_seconds=60, max_entries=2)
+    put(cache, db, "a")
+    put(cache, db, "b")
+    assert cache.get(db, "a") == SKILLS
+
+    put(cache, db, "c")
+    assert cache.get(db, "b") is None
+    assert cache.get(db, "a") == SKILLS and cache.get(db, "c") == SKILLS
+    assert cache.evictions == 1
+
+
+def test_concurrent_puts_of_one_key_keep_one_entry(tmp_path):
+    # A connection per thread, as with separate workers, so not in memory
+    engine, make_session = sessions(f"sqlite:///{tmp_path / 'cache.db'}", connect_args={"timeout": 30})
+    cache = ExtractionCache(ttl_seconds=60, max_entries=10)
+    errors = []
+
+    def store():
+        db = make_session()
+        try:
+            put(cache, db, "same")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=store) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = make_session()
+    assert errors == []
+    assert db.query(LLMExtraction).count() == 1
+    assert cache.stores == 8 and cache.get(db, "same") == SKILLS
+    db.close()
+    engine.dispose()
+
+
+def test_stats_add_up(make_session):
+    db = make_session()
+    cache = ExtractionCache(ttl_seconds=60, max_entries=10)
+    put(cache, db, "a", latency=1.5)
+    put(cache, db, "b", latency=0.5)
+    for key in ["a", "a", "b", "missing"]:
+        cache.get(db, key)
+
+    stats = cache.stats(db)
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+    assert stats["hit_rate"] == 0.75
+    assert stats["stores"] == 2 and stats["evictions"] == 0
+    assert stats["estimated_llm_seconds_saved"] == 3.5
+    assert stats["shared"] == {
+        "entries": 2, "max_entries": 10, "hits": 3, "estimated_llm_seconds_saved": 3.5
+    }
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+import stat
+
+import pytest
+
+from app.services.compile_pool import CompilePool, CompileTimeout
+from app.services.latex_engines import BACKENDS, EngineSelector, LatexEngine, TexBackend, needs_rerun
+from app.services.latex_formats import FormatCache
+from app.services.pdf_cache import PdfCache
+
+SOURCE = "\\documentclass{article}\n\\usepackage{xcolor}\n\\begin{document}\nHi\n\\end{document}\n"
+
+
+def test_backend_command_and_profile():
+    command = BACKENDS["lualatex"].command("doc.tex", jobname="temp")
+    assert command[0] == "lualatex"
+    assert "-halt-on-error" in command and "-jobname=temp" in command
+    assert command[-1] == "doc.tex"
+    assert BACKENDS["lualatex"].profile != BACKENDS["pdflatex"].profile
+
+
+def test_selector_persists_fastest_backend(tmp_path):
+    path = str(tmp_path / "selection.json")
+    selector = EngineSelector(path=path)
+    assert selector.choose(SOURCE) == "pdflatex"
+
+    digest = selector.claim_benchmark(SOURCE)
+    assert digest is not None
+    assert selector.claim_benchmark(SOURCE) is None  # already in progress
+
+    winner = selector.record(digest, {"pdflatex": 0.9, "lualatex": 0.4, "xelatex": None})
+    assert winner == "lualatex"
+    # A fresh process reads the stored choice
+    assert EngineSelector(path=path).choose(SOURCE) == "lualatex"
+
+
+def test_forced_backend_skips_selection(tmp_path):
+    selector = EngineSelector(path=str(tmp_path / "selection.json"), forced="xelatex")
+    assert selector.choose(SOURCE) == "xelatex"
+    assert selector.claim_benchmark(SOURCE) is None
+
+
+def test_needs_rerun_on_log_or_aux_change():
+    assert needs_rerun("LaTeX Warning: Label(s) may have changed. Rerun to get cross-references right.", b"", b"")
+    assert needs_rerun("", b"old", b"new")
+    assert not needs_rerun("Output written on temp.pdf", b"same", b"same")
+
+
+def test_open_pdf_survives_eviction(tmp_path):
+    cache = PdfCache(str(tmp_path / "cache"), max_bytes=10 ** 6, memory_items=0)
+    engine = LatexEngine(
+        pool=None, sandboxes=None, pdf_cache=cache, format_cache=None,
+        selector=EngineSelector(path=str(tmp_path / "selection.json"), forced="pdflatex")
+    )
+    compiles = []
+
+    async def compile_to_path(content, backend=None):
+        compiles.append(content)
+        path = cache.put(engine.cache_key(content, backend), b"%PDF-1.5")
+        if len(compiles) == 1:
+            os.remove(path)  # evicted before the caller could open it
+        return path
+
+    engine.compile_to_path = compile_to_path
+    pdf_file = asyncio.run(engine.open_pdf(SOURCE))
+    assert len(compiles) == 2
+
+    # Evicted again while being served: the open file is still readable
+    os.remove(pdf_file.name)
+    with pdf_file:
+        assert pdf_file.read() == b"%PDF-1.5"
+
+
+def fake_backend(tmp_path, script):
+    binary = tmp_path / "fakelatex"
+    binary.write_text(f"#!/bin/sh\n{script}\n")
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    return TexBackend("fake", str(binary), "fake")
+
+
+def test_run_sync_queues_on_the_compile_pool(tmp_path):
+    pool = CompilePool(workers=1, queue_depth=4, timeout=10)
+    engine = LatexEngine(
+        pool=pool, sandboxes=None, pdf_cache=None, format_cache=None,
+        selector=EngineSelector(path=str(tmp_path / "selection.json"))
+    )
+    # Records where included files are looked up
+    backend = fake_backend(tmp_path, "printf '%s' \"$TEXINPUTS\" > temp.pdf")
+
+    # No app running: the pool is started for the compile and stopped again
+    pdf_path = engine.run_sync(SOURCE, backend, str(tmp_path), search_path="/sources")
+    assert open(pdf_path).read().startswith(f"/sources{os.pathsep}")
+    assert pool.loop is None
+
+    async def app():
+        before = pool.compile_time.snapshot()["count"]
+        await pool.submit(lambda: asyncio.sleep(0))
+        with pytest.raises(RuntimeError):
+            engine.run_sync(SOURCE, backend, str(tmp_path))
+        # From a worker thread it waits its turn on the app's pool
+        await asyncio.to_thread(engine.run_sync, SOURCE, backend, str(tmp_path))
+        compiles = pool.compile_time.snapshot()["count"] - before
+        await pool.shutdown()
+        return compiles
+
+    assert asyncio.run(app()) == 2
+
+    with pytest.raises(CompileTimeout):
+        engine.run_sync(SOURCE, fake_backend(tmp_path, "sleep 5"), str(tmp_path), timeout=0.2)
+
+
+def test_selector_skips_failures_and_caps_entries(tmp_path):
+    path = tmp_path / "selection.json"
+    selector = EngineSelector(path=str(path), max_entries=2)
+    sources = [SOURCE.replace("xcolor", package) for package in ("geometry", "enumitem", "hyperref")]
+
+    digest = selector.claim_benchmark(sources[0])
+    assert selector.record(digest, {"pdflatex": None, "lualatex": None}) is None
+    assert not path.exists() and selector.claim_benchmark(sources[0]) is None
+
+    for source in sources[1:] + [SOURCE]:
+        selector.record(selector.claim_benchmark(source), {"pdflatex": 1.0})
+    stored = json.loads(path.read_text())
+    assert list(stored) == [EngineSelector.template_hash(s) for s in (sources[2], SOURCE)]
+
+
+def test_only_registered_templates_are_benchmarked(tmp_path):
+    formats = FormatCache(str(tmp_path / "formats"))
+    formats.register(SOURCE)
+    engine = LatexEngine(
+        pool=None, sandboxes=None, pdf_cache=None, format_cache=formats,
+        selector=EngineSelector(path=str(tmp_path / "selection.json"))
+    )
+    benchmarked = []
+    engine._benchmark = lambda content, digest: benchmarked.append(digest) or asyncio.sleep(0)
+
+    async def compiles():
+        engine._maybe_benchmark(SOURCE.replace("xcolor", "geometry"))
+        engine._maybe_benchmark(SOURCE)
+        await asyncio.sleep(0)
+
+    asyncio.run(compiles())
+    assert benchmarked == [EngineSelector.template_hash(SOURCE)]
@@ -0,0 +1,48 @@
+import asyncio
+
+from app.services.latex_formats import FormatCache, split_preamble
+
+TEMPLATE = r"""\documentclass{article}
+\usepackage{enumitem}
+\input{glyphtounicode}
+% \begin{document} in a comment is not the end of the preamble
+\pdfgentounicode=1
+\begin{document}
+Hello
+\end{document}
+"""
+
+
+def test_split_preamble_skips_commented_begin_document():
+    preamble, body = split_preamble(TEMPLATE)
+    assert preamble.endswith("\\pdfgentounicode=1\n")
+    assert body.startswith("\\begin{document}")
+    assert split_preamble("no document here") is None
+
+
+def test_lookup_rewrites_known_preamble_once_format_exists(tmp_path):
+    cache = FormatCache(str(tmp_path))
+    cache._stamp = "teststamp"
+    digest = cache.register(TEMPLATE)
+
+    edited = TEMPLATE.replace("Hello", "Hello, edited")
+    assert cache.lookup(edited) is None  # not built yet
+
+    name = cache._format_name(digest)
+    (tmp_path / f"{name}.fmt").write_bytes(b"")
+    prepared = cache.lookup(edited)
+
+    assert prepared.format_name == name
+    assert "\\usepackage" not in prepared.source
+    assert "\\input{glyphtounicode}" in prepared.source
+    assert prepared.source.rstrip().endswith("Hello, edited\n\\end{document}")
+    assert cache.lookup(TEMPLATE.replace("enumitem", "geometry")) is None
+
+
+def test_tex_stamp_without_tex_disables_formats(tmp_path):
+    cache = FormatCache(str(tmp_path), engine="no-such-latex")
+    digest = cache.register(TEMPLATE)
+
+    assert asyncio.run(cache.tex_stamp()) is None
+    assert asyncio.run(cache.build(digest)) is False
+    assert asyncio.run(cache.prepare(TEMPLATE)) is None
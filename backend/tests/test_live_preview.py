@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from app.services.live_preview import PreviewChannel, parse_preview_message
+
+
+def test_only_newest_revision_is_compiled_and_sent():
+    async def scenario():
+        compiled, cancelled, sent = [], [], []
+
+        async def compile(content):
+            compiled.append(content)
+            try:
+                await asyncio.sleep(0.2)
+            except asyncio.CancelledError:
+                cancelled.append(content)
+                raise
+            return content.encode()
+
+        async def send_pdf(revision, pdf):
+            sent.append((revision, pdf))
+
+        async def send_error(revision, detail):
+            sent.append((revision, detail))
+
+        channel = PreviewChannel(compile, send_pdf, send_error, debounce=0.05)
+        worker = asyncio.ensure_future(channel.run())
+
+        # A burst inside the debounce window collapses into one compile
+        for revision in range(1, 4):
+            channel.submit(revision, f"v{revision}")
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+        # A newer revision cancels the compile already in flight
+        channel.submit(4, "v4")
+        await asyncio.sleep(0.4)
+
+        worker.cancel()
+        await channel.close()
+        return compiled, cancelled, sent
+
+    compiled, cancelled, sent = asyncio.run(scenario())
+    assert compiled == ["v3", "v4"]
+    assert cancelled == ["v3"]
+    assert sent == [(4, b"v4")]
+
+
+def test_preview_messages_are_validated():
+    assert parse_preview_message('{"revision": 7, "content": "x"}', 3) == (7, "x")
+    assert parse_preview_message('{"content": "x"}', 3) == (4, "x")
+    for bad in [None, "not json", "[1, 2]", '{"revision": 1}', '{"revision": "x", "content": "x"}',
+                '{"revision": true, "content": "x"}']:
+        with pytest.raises(ValueError):
+            parse_preview_message(bad, 0)
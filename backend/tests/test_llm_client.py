@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.services.fake_llm_server import create_app
+from app.services.llm_client import CircuitBreaker, LLMClient, LLMError, LLMUnavailable
+
+MESSAGES = [{"role": "user", "content": "Resume Text:\nPython, Docker and teamwork\n\nProvide the output"}]
+
+
+def scripted(statuses):
+    """Transport answering with the given statuses in turn, then 200s."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        status = statuses[len(calls) - 1] if len(calls) <= len(statuses) else 200
+        if status != 200:
+            return httpx.Response(status, json={"error": {"message": "nope"}})
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    return httpx.MockTransport(handler), calls
+
+
+def test_calls_run_concurrently_against_the_fake_provider():
+    async def scenario():
+        client = LLMClient(
+            "http://fake/v1", "key", max_concurrency=8,
+            transport=httpx.ASGITransport(app=create_app(latency_ms=100))
+        )
+        started = time.perf_counter()
+        replies = await asyncio.gather(*(client.chat(MESSAGES, model="fake") for _ in range(16)))
+        elapsed = time.perf_counter() - started
+        await client.aclose()
+        return replies, elapsed
+
+    replies, elapsed = asyncio.run(scenario())
+    # Two waves of eight, not sixteen calls in a row
+    assert elapsed < 0.8
+    assert "Python" in json.loads(replies[0])["technical_skills"]
+
+
+def test_transient_failures_are_retried():
+    transport, calls = scripted([503, 429])
+    client = LLMClient("http://fake/v1", "key", backoff_seconds=0, transport=transport)
+
+    assert asyncio.run(client.chat(MESSAGES, model="fake")) == "ok"
+    assert len(calls) == 3 and client.retries == 2
+
+
+def test_client_errors_are_not_retried():
+    transport, calls = scripted([400])
+    client = LLMClient("http://fake/v1", "key", backoff_seconds=0, transport=transport)
+
+    with pytest.raises(LLMError):
+        asyncio.run(client.chat(MESSAGES, model="fake"))
+    assert len(calls) == 1
+
+
+def test_breaker_fails_fast_once_open():
+    transport, calls = scripted([503] * 10)
+    client = LLMClient(
+        "http://fake/v1", "key", max_retries=0, transport=transport,
+        breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    )
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(LLMUnavailable) as raised:
+                await client.chat(MESSAGES, model="fake")
+        return raised.value
+
+    rejected = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert client.breaker.state == "open" and rejected.retry_after > 0
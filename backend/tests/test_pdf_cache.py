@@ -0,0 +1,42 @@
+import os
+
+from app.services.pdf_cache import PdfCache, normalize_latex_source
+
+
+def test_key_ignores_whitespace_noise_but_not_compiler():
+    source = "\\documentclass{article}\n\\begin{document}\nHi\n\\end{document}\n"
+    noisy = "\r\n" + source.replace("\n", "   \r\n") + "\n\n"
+    assert normalize_latex_source(noisy) == normalize_latex_source(source)
+    assert PdfCache.key(source, ("pdflatex",)) == PdfCache.key(noisy, ("pdflatex",))
+    assert PdfCache.key(source, ("pdflatex",)) != PdfCache.key(source, ("lualatex",))
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=10_000, memory_items=1)
+    assert cache.get("a" * 64) is None
+
+    cache.put("a" * 64, b"%PDF-a")
+    cache.put("b" * 64, b"%PDF-b")
+    # "a" fell out of the single-slot memory tier but is still on disk
+    assert cache.get("b" * 64) == b"%PDF-b"
+    assert cache.get("a" * 64) == b"%PDF-a"
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["disk_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=250, memory_items=0)
+    for index, key in enumerate(["a", "b"]):
+        path = cache.put(key * 64, b"x" * 100)
+        os.utime(path, (index, index))
+
+    # Touching "a" makes "b" the oldest entry
+    assert cache.get_path("a" * 64) is not None
+    cache.put("c" * 64, b"x" * 100)
+
+    assert cache.get_path("b" * 64) is None
+    assert cache.get_path("a" * 64) is not None
+    assert cache.stats()["disk_bytes"] <= 250
@@ -0,0 +1,24 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.responses import open_file_response
+
+
+def test_open_file_survives_unlink(tmp_path):
+    path = tmp_path / "cached.pdf"
+    path.write_bytes(b"%PDF-cached")
+    app = FastAPI()
+
+    @app.get("/pdf")
+    def pdf():
+        handle = open(path, "rb")
+        # Simulate the cache evicting the entry while the response is pending
+        os.unlink(path)
+        return open_file_response(handle, media_type="application/pdf")
+
+    response = TestClient(app).get("/pdf")
+    assert response.status_code == 200
+    assert response.content == b"%PDF-cached"
+    assert response.headers["content-type"] == "application/pdf"
@@ -0,0 +1,29 @@
+import os
+
+from app.services.sandbox import SandboxPool
+
+
+def test_sandbox_is_reused_and_emptied(tmp_path):
+    pool = SandboxPool(size=1, root=str(tmp_path))
+
+    with pool.sandbox() as first:
+        for name in ["temp.tex", "temp.toc", "temp.synctex.gz"]:
+            open(os.path.join(first, name), "w").close()
+        os.mkdir(os.path.join(first, "_minted-temp"))
+
+    with pool.sandbox() as second:
+        assert second == first
+        assert os.listdir(second) == []
+
+    pool.close()
+    assert not os.listdir(tmp_path)
+
+
+def test_overflow_sandbox_is_removed(tmp_path):
+    pool = SandboxPool(size=1, root=str(tmp_path))
+    with pool.sandbox() as busy:
+        with pool.sandbox() as extra:
+            assert extra != busy
+        assert not os.path.exists(extra)
+    assert pool.overflows == 1
+    pool.close()
@@ -0,0 +1,39 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core import skill_categorization
+from app.core.skill_categorization import MIN_SIMILARITY, get_categorizer
+from app.models.skills import SkillCategory
+from app.schemas.skills import SkillCategorizeRequest
+
+
+def test_exact_matches_take_precedence():
+    categorizer = get_categorizer()
+    assert categorizer.categorize_many(["Python", "teamwork"]) == [
+        (SkillCategory.TECHNICAL, 1.0),
+        (SkillCategory.SOFT, 1.0),
+    ]
+
+
+def test_unrelated_names_fall_back_to_hard():
+    (category, confidence), = get_categorizer().categorize_many(["qwxzv"])
+    assert category == SkillCategory.HARD and confidence < MIN_SIMILARITY
+
+
+def test_batches_match_single_lookups(monkeypatch):
+    categorizer = get_categorizer()
+    names = ["Python", "Kubernetes clusters", "public speaking", "budget forecasting", "qwxzv"]
+    whole = categorizer.categorize_many(names)
+    # Split across several sparse products
+    monkeypatch.setattr(skill_categorization, "BATCH_SIZE", 2)
+    assert categorizer.categorize_many(names) == whole
+    assert whole == [categorizer.categorize_many([name])[0] for name in names]
+    assert [categorizer.infer_category(name) for name in names] == [
+        category for category, _ in categorizer.categorize_many(names)
+    ]
+
+
+def test_blank_names_are_rejected():
+    assert SkillCategorizeRequest(names=["  Python "]).names == ["Python"]
+    with pytest.raises(ValidationError):
+        SkillCategorizeRequest(names=["Python", "   "])
@@ -0,0 +1,91 @@
+import numpy as np
+
+from app.services.skill_embeddings import SkillEmbeddingIndex
+
+DIMENSIONS = 16
+
+
+def random_skills(count, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, DIMENSIONS)).astype(np.float32)
+    skills = [(f"skill-{i}", f"name-{i}") for i in range(count)]
+    lookup = dict(zip((name for _, name in skills), vectors))
+    return skills, vectors, lambda names: np.array([lookup[name] for name in names])
+
+
+def brute_force(vectors, row, k):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ unit[row]
+    scores[row] = -np.inf
+    return [f"skill-{i}" for i in np.argsort(-scores)[:k]]
+
+
+def test_related_matches_a_brute_force_scan(tmp_path):
+    skills, vectors, embed = random_skills(200)
+    index = SkillEmbeddingIndex(str(tmp_path))
+    index.build(skills, embed)
+
+    assert isinstance(index._build.vectors, np.memmap)
+    related = index.related("skill-7", k=5)
+    assert [skill_id for skill_id, _ in related] == brute_force(vectors, 7, 5)
+    assert all(a[1] >= b[1] for a, b in zip(related, related[1:]))
+
+
+def test_other_workers_map_the_same_build(tmp_path):
+    skills, _, embed = random_skills(50)
+    SkillEmbeddingIndex(str(tmp_path)).build(skills, embed)
+
+    reader = SkillEmbeddingIndex(str(tmp_path))
+    assert reader.load() and len(reader) == 50
+    assert reader.related("skill-3", k=3)
+    assert reader.related("missing", k=3) == []
+
+
+def test_ivf_with_every_list_probed_is_exact(tmp_path):
+    skills, vectors, embed = random_skills(400, seed=1)
+    index = SkillEmbeddingIndex(str(tmp_path), ivf_min_skills=100, nprobe=1000)
+    index.build(skills, embed)
+
+    assert len(index._build.offsets) == 21
+    assert [skill_id for skill_id, _ in index.related("skill-11", k=5)] == brute_force(vectors, 11, 5)
+
+    index.nprobe = 2
+    assert len(index.related("skill-11", k=5)) == 5
+
+
+def test_rebuilds_embed_only_new_skills(tmp_path):
+    skills, vectors, embed = random_skills(60)
+    embedded = []
+
+    def counting(names):
+        embedded.extend(names)
+        return embed(names)
+
+    index = SkillEmbeddingIndex(str(tmp_path))
+    index.build(skills[:50], counting)
+    index.build(skills, counting)
+
+    assert len(embedded) == 60 and len(index) == 60
+    assert [skill_id for skill_id, _ in index.related("skill-55", k=5)] == brute_force(vectors, 55, 5)
+
+
+def test_new_skills_join_existing_ivf_lists(tmp_path):
+    skills, vectors, embed = random_skills(400, seed=1)
+    index = SkillEmbeddingIndex(str(tmp_path), ivf_min_skills=100, nprobe=1000)
+    index.build(skills[:300], embed)
+    centroids = index._build.centroids
+    index.build(skills, embed)
+
+    assert index._build.centroids is not None and (index._build.centroids == centroids).all()
+    assert [skill_id for skill_id, _ in index.related("skill-350", k=5)] == brute_force(vectors, 350, 5)
+
+
+def test_only_one_worker_builds_at_a_time(tmp_path):
+    skills, _, embed = random_skills(20)
+    index = SkillEmbeddingIndex(str(tmp_path))
+    other_worker = SkillEmbeddingIndex(str(tmp_path))
+
+    with other_worker._build_lock():
+        assert index.build(skills, embed, wait=False) is False
+    assert not index.loaded
+    assert index.build(skills, embed, wait=False) and len(index) == 20
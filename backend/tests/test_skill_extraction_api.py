@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.api.v1 import skills
+from app.core.auth import get_current_active_user
+from app.main import app
+from app.services.llm_client import LLMClient
+
+RESUME = r"""
+\section{Skills}
+Python, Docker, teamwork and a dozen other things worth listing here
+"""
+
+
+def test_unparseable_llm_output_is_a_bad_gateway(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, json={"choices": [{"message": {"content": "Sorry, I can't help with that."}}]})
+
+    client = LLMClient("http://fake/v1", "key", max_retries=0, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(skills, "get_groq_client", lambda: client)
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id=uuid4())
+    try:
+        response = TestClient(app).post(
+            "/api/v1/skills/skills/extract",
+            files={"file": ("resume.tex", f"{RESUME}{uuid4().hex}".encode(), "application/x-tex")},
+        )
+    finally:
+        app.dependency_overrides.pop(get_current_active_user)
+
+    assert response.status_code == 502
+    assert "Skill extraction failed" in response.json()["detail"]
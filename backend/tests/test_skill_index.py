@@ -0,0 +1,40 @@
+from app.services.skill_index import IndexedSkill, SkillIndex
+
+NAMES = ["Python", "Jython", "Python Testing", "Data Analysis with Python", "Java", "JavaScript", "React.js"]
+
+
+def make_index():
+    index = SkillIndex()
+    index.load(IndexedSkill(id=i, name=name, category="technical", source="SEED") for i, name in enumerate(NAMES))
+    return index
+
+
+def names(results):
+    return [skill.name for skill in results]
+
+
+def test_ranks_exact_then_prefix_then_word_then_substring():
+    index = make_index()
+    assert names(index.search("python")) == [
+        "Python", "Python Testing", "Data Analysis with Python"
+    ]
+    assert names(index.search("ython")) == ["Jython", "Python", "Python Testing", "Data Analysis with Python"]
+    assert names(index.search("  JAVA ")) == ["Java", "JavaScript"]
+
+
+def test_limit_and_offset():
+    index = make_index()
+    everything = names(index.search("a", limit=100))
+    assert names(index.search("a", limit=2, offset=1)) == everything[1:3]
+    assert names(index.search(None, limit=3)) == ["Data Analysis with Python", "Java", "JavaScript"]
+
+
+def test_added_skills_are_searchable():
+    index = make_index()
+    assert index.search("rust") == []
+    index.add(IndexedSkill(id=100, name="Rust", category="technical", source="USER"))
+    assert names(index.search("rus")) == ["Rust"]
+    # Renaming replaces the old entry
+    index.add(IndexedSkill(id=100, name="Rustlang", category="technical", source="USER"))
+    assert names(index.search("rust")) == ["Rustlang"]
+    assert len(index) == len(NAMES) + 1
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from app.services.skill_matcher import SkillMatcher, edit_distance, skill_key
+
+CATALOG = ["Python", "React.js", "Node.js", "C", "C++", "C#", "Go", "Kubernetes", "JavaScript", "MySQL", "Flask", "Java"]
+
+
+def make_matcher(max_distance=1):
+    matcher = SkillMatcher(max_distance=max_distance)
+    matcher.load(SimpleNamespace(id=name, name=name) for name in CATALOG)
+    return matcher
+
+
+def test_keys_fold_case_spacing_and_punctuation_but_not_symbols():
+    assert skill_key(" React.JS ") == skill_key("ReactJS") == "reactjs"
+    assert len({skill_key("C"), skill_key("C++"), skill_key("C#")}) == 3
+
+
+def test_keys_keep_letters_of_every_script():
+    keys = {skill_key("中文"), skill_key("Русский"), skill_key("日本語"), skill_key("Ελληνικά")}
+    assert len(keys) == 4 and "" not in keys
+    assert skill_key("РУССКИЙ") == skill_key("русский")
+    # Full-width and other compatibility forms fold to their plain spelling
+    assert skill_key("Ｐｙｔｈｏｎ") == skill_key("python")
+    assert skill_key("...") == ""
+    assert make_matcher().match("---") is None
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("pyhton", "python", limit=2) == 1
+    assert edit_distance("kitten", "sitting", limit=1) == 2  # capped at limit + 1
+
+
+def test_resolves_near_duplicates():
+    matcher = make_matcher()
+    assert matcher.match("Pyhton") == "Python"
+    assert matcher.match("reactjs") == "React.js"
+    assert matcher.match("Node") == "Node.js"
+    assert matcher.match("Javascrpit") == "JavaScript"
+    assert matcher.match("c ++") == "C++"
+
+
+def test_short_and_unrelated_names_are_not_merged():
+    matcher = make_matcher(max_distance=2)
+    assert matcher.match("R") is None
+    assert matcher.match("Goo") is None
+    assert matcher.match("Rust") is None
+    assert matcher.match("Kuberentes") == "Kubernetes"
+
+
+def test_added_skills_become_canonical():
+    matcher = make_matcher()
+    matcher.add("TensorFlow", "tf")
+    assert matcher.match("Tensorflow") == "tf"
+    assert matcher.match("TensorFlw") == "tf"
+
+
+def test_short_names_one_letter_apart_are_different_skills():
+    matcher = make_matcher(max_distance=2)
+    assert matcher.match("MSSQL") is None
+    assert matcher.match("Flash") is None
+    assert matcher.match("Pythn") is None
+    assert matcher.match("Jaav") is None  # too short to correct at all
+    # A swapped pair is still a typo
+    assert matcher.match("MySLQ") == "MySQL"
+    assert matcher.match("Falsk") == "Flask"
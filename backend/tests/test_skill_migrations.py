@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.init_db import migrate_skill_normalized_name
+from app.models import Base, Skill, UserSkill
+from app.models.skills import SkillCategory
+
+
+def test_recomputed_keys_keep_non_latin_skills_apart(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'skills.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    started = datetime.utcnow()
+    ids = {}
+    rows = []
+    # As an earlier key stored them: every non-Latin name folded to ""
+    for offset, (name, key) in enumerate([
+        ("中文", ""), ("Русский", None), ("日本語", None), ("React.js", "reactjs"), ("ReactJS", None), ("...", None)
+    ]):
+        ids[name] = uuid4()
+        rows.append({
+            "id": ids[name], "name": name, "normalized_name": key, "category": SkillCategory.SOFT,
+            "created_at": started + timedelta(seconds=offset),
+        })
+    db.execute(insert(Skill.__table__), rows)
+    user_id = uuid4()
+    db.execute(insert(UserSkill.__table__), [
+        {"id": uuid4(), "user_id": user_id, "skill_id": ids["React.js"], "rating": 4.0},
+        {"id": uuid4(), "user_id": user_id, "skill_id": ids["ReactJS"], "rating": 9.0},
+        {"id": uuid4(), "user_id": uuid4(), "skill_id": ids["ReactJS"], "rating": 6.0},
+    ])
+    db.commit()
+
+    migrate_skill_normalized_name(db)
+
+    keys = dict(db.query(Skill.name, Skill.normalized_name))
+    assert keys == {"中文": "中文", "Русский": "русский", "日本語": "日本語", "React.js": "reactjs", "...": None}
+    # The duplicate spelling is merged into the older skill, its ratings moved over
+    ratings = sorted(rating for (rating,) in db.query(UserSkill.rating).filter(UserSkill.skill_id == ids["React.js"]))
+    assert ratings == [4.0, 6.0]
+
+    # Already current: a second run changes nothing
+    migrate_skill_normalized_name(db)
+    assert dict(db.query(Skill.name, Skill.normalized_name)) == keys
+    db.close()
+    engine.dispose()
@@ -0,0 +1,41 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.skills import skill_index
+from app.core.database import SessionLocal, engine
+from app.main import app
+from app.models import Skill
+from app.models.skills import SkillCategory
+from app.services.skill_search import skill_fts
+
+
+def test_names_come_from_the_index_and_descriptions_from_full_text(monkeypatch):
+    assert skill_fts.install(engine)
+    marker = uuid4().hex[:8]
+    db = SessionLocal()
+    db.add_all([
+        Skill(name=f"Kubernetes{marker}", category=SkillCategory.TECHNICAL, source="SEED"),
+        Skill(
+            name=f"Helm {uuid4().hex[:8]}", category=SkillCategory.TECHNICAL, source="SEED",
+            description=f"Charts for orchestration{marker}",
+        ),
+    ])
+    db.commit()
+    db.close()
+    skill_index._checked_at = None  # reload with the new rows
+
+    fts_queries = []
+    fts_search = skill_fts.search
+    monkeypatch.setattr(
+        skill_fts, "search", lambda db, query, **kwargs: fts_queries.append(query) or fts_search(db, query, **kwargs)
+    )
+    client = TestClient(app)
+
+    by_name = client.get("/api/v1/skills/skills", params={"query": f"bernetes{marker}"})
+    assert [skill["name"] for skill in by_name.json()] == [f"Kubernetes{marker}"]
+    assert fts_queries == []
+
+    by_description = client.get("/api/v1/skills/skills", params={"query": f"orchestration{marker}"})
+    assert [skill["name"][:4] for skill in by_description.json()] == ["Helm"]
+    assert fts_queries == [f"orchestration{marker}"]
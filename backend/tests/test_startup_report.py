@@ -0,0 +1,26 @@
+from app.core.startup_report import by_package, measure_footprint, parse_importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     sqlalchemy.util
+import time:       300 |        420 |   sqlalchemy
+import time:        80 |         80 |   fastapi.params
+import time:        50 |        550 | app.main
+"""
+
+
+def test_parse_importtime_reads_depth_and_times():
+    timings = parse_importtime(SAMPLE)
+    assert [t.module for t in timings] == ["sqlalchemy.util", "sqlalchemy", "fastapi.params", "app.main"]
+    assert [t.depth for t in timings] == [2, 1, 1, 0]
+    assert timings[-1].cumulative_us == 550
+
+
+def test_by_package_sums_self_time():
+    assert by_package(parse_importtime(SAMPLE)) == {"sqlalchemy": 420, "fastapi": 80, "app": 50}
+
+
+def test_measure_footprint_reports_each_step():
+    steps = measure_footprint("json", ["gc:collect"])
+    assert [step for step, _, _ in steps] == ["import json", "gc:collect"]
+    assert all(seconds >= 0 and rss_mb > 0 for _, seconds, rss_mb in steps)
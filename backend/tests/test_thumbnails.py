@@ -0,0 +1,63 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+from app.services import thumbnails
+from app.services.thumbnails import ThumbnailCache
+
+
+def fake_pdftoppm(monkeypatch):
+    """Stand-in for pdftoppm that records the PDF it was given."""
+    rendered = []
+
+    async def run_process(args):
+        pdf_path, prefix = args[-2], args[-1]
+        rendered.append(pdf_path)
+        with open(f"{prefix}.png", "wb") as f:
+            f.write(b"png of " + open(pdf_path, "rb").read())
+        return SimpleNamespace(returncode=0, stderr="")
+
+    monkeypatch.setattr(thumbnails, "run_process", run_process)
+    return rendered
+
+
+def test_missing_sizes_render_from_the_hash_alone(tmp_path, monkeypatch):
+    rendered = fake_pdftoppm(monkeypatch)
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), max_bytes=10_000)
+    pdf = tmp_path / "resume.pdf"
+    pdf.write_bytes(b"%PDF-1.5 resume")
+
+    with open(pdf, "rb") as pdf_file:
+        pdf_hash = asyncio.run(cache.render(pdf_file, 320))
+    # The compiled PDF may be long gone by the time another size is asked for
+    pdf.unlink()
+    with asyncio.run(cache.render_hash(pdf_hash, 160)) as thumbnail:
+        assert thumbnail.read() == b"png of %PDF-1.5 resume"
+    with cache.open(pdf_hash, 160) as thumbnail:
+        assert thumbnail.name == cache.path(pdf_hash, 160)
+
+    asyncio.run(cache.render_hash(pdf_hash, 160)).close()
+    assert len(rendered) == 2
+    assert asyncio.run(cache.render_hash("0" * 64, 160)) is None
+    shard = os.path.dirname(cache.path(pdf_hash, 160))
+    assert not any(name.endswith(".tmp") or name.startswith("tmp") for name in os.listdir(shard))
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    fake_pdftoppm(monkeypatch)
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), max_bytes=100)
+    hashes = []
+    for name in ("a", "b", "c"):
+        pdf = tmp_path / f"{name}.pdf"
+        pdf.write_bytes(b"%PDF " + name.encode() * 20)
+        with open(pdf, "rb") as pdf_file:
+            hashes.append(asyncio.run(cache.render(pdf_file, 160)))
+            # Distinct mtimes so recency order is unambiguous
+            for path in (cache.source_path(hashes[-1]), cache.path(hashes[-1], 160)):
+                os.utime(path, (len(hashes), len(hashes)))
+
+    total = sum(entry[1] for entry in cache._scan())
+    assert total <= 100 and cache.stats()["evictions"] > 0
+    assert cache.open(hashes[0], 160) is None
+    with cache.open(hashes[-1], 160) as thumbnail:
+        assert thumbnail.read().endswith(b"c" * 20)
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.core.auth import get_current_active_user
+from app.core.database import SessionLocal
+from app.main import app
+from app.models import Skill, UserSkill
+from app.models.skills import SkillCategory
+
+
+def test_posting_the_same_skill_twice_updates_the_rating():
+    user = SimpleNamespace(id=uuid4())
+    db = SessionLocal()
+    skill = Skill(name=f"Rust {uuid4().hex[:8]}", category=SkillCategory.TECHNICAL, source="SEED")
+    db.add(skill)
+    db.commit()
+
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    try:
+        client = TestClient(app)
+        first = client.post("/api/v1/skills/user-skills", json={"skill_id": str(skill.id), "rating": 4})
+        second = client.post("/api/v1/skills/user-skills", json={"skill_id": str(skill.id), "rating": 8})
+    finally:
+        app.dependency_overrides.pop(get_current_active_user)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["rating"] == 8
+    assert db.query(UserSkill).filter_by(user_id=user.id, skill_id=skill.id).count() == 1
+    db.close()
+
+
+def test_non_latin_skills_stay_distinct():
+    user = SimpleNamespace(id=uuid4())
+    suffix = uuid4().hex[:6]
+    names = [f"中文{suffix}", f"Русский{suffix}", f"日本語{suffix}"]
+
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    try:
+        client = TestClient(app)
+        first = client.post("/api/v1/skills/user-skills/batch", json={
+            "soft_skills": [{"name": names[0], "rating": 5}, {"name": names[1], "rating": 7}]
+        })
+        second = client.post("/api/v1/skills/user-skills/batch", json={
+            "soft_skills": [{"name": names[2], "rating": 3}]
+        })
+    finally:
+        app.dependency_overrides.pop(get_current_active_user)
+
+    assert first.status_code == second.status_code == 200
+    assert sorted((row["skill"]["name"], row["rating"]) for row in first.json()) == sorted(
+        [(names[0], 5.0), (names[1], 7.0)]
+    )
+    assert [(row["skill"]["name"], row["rating"]) for row in second.json()] == [(names[2], 3.0)]
@@ -95,6 +95,11 @@ export interface CompileLatexRequest {
   content: string;
 }
 
+export interface PreviewChannel {
+  send: (content: string) => void;
+  close: () => void;
+}
+
 export interface PredefinedTemplate {
   id: string;
   name: string;
@@ -312,6 +317,55 @@ export class Api {
     };
   }
 
+  // Live preview: the server debounces edits, cancels superseded compiles
+  // and only answers for the newest revision sent on this channel
+  openPreviewChannel(
+    onPdf: (pdf: Blob, revision: number) => void,
+    onError: (error: string, revision: number) => void
+  ): PreviewChannel {
+    const wsUrl = this.baseUrl.replace(/^http/, 'ws');
+    const socket = new WebSocket(
+      `${wsUrl}/resumes/preview/ws?token=${encodeURIComponent(getAuthToken() || '')}`
+    );
+    socket.binaryType = 'blob';
+
+    let revision = 0;
+    let pending: string | null = null;
+    let pdfRevision = -1;
+
+    socket.onopen = () => {
+      if (pending !== null) {
+        socket.send(JSON.stringify({ revision, content: pending }));
+        pending = null;
+      }
+    };
+
+    socket.onmessage = (event) => {
+      if (event.data instanceof Blob) {
+        onPdf(event.data, pdfRevision);
+        return;
+      }
+      const message = JSON.parse(event.data);
+      if (message.type === 'pdf') {
+        pdfRevision = message.revision;
+      } else if (message.type === 'error') {
+        onError(message.detail, message.revision);
+      }
+    };
+
+    return {
+      send: (content: string) => {
+        revision += 1;
+        if (socket.readyState === WebSocket.OPEN) {
+          socket.send(JSON.stringify({ revision, content }));
+        } else {
+          pending = content;
+        }
+      },
+      close: () => socket.close(),
+    };
+  }
+
   async getPredefinedTemplates(): Promise<ApiResponse<PredefinedTemplate[]>> {
     return handleResponse(await fetch(`${this.baseUrl}/templates/predefined`, {
       headers: getAuthHeader(),